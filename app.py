@@ -16,20 +16,23 @@ from src.helper_function import clean_html_response
 from src.save_attributes import bottom_wear_save_attributes, top_wear_save_attributes
 from src.clothing_shortlist import get_next_wardrobe_batch
 from src.llm_response import LLMInvoke
+from werkzeug.middleware.proxy_fix import ProxyFix
 from werkzeug.utils import secure_filename
 from flask_cors import CORS
-from src.AttributePred import get_all_attribute_predictions
-import csv
+from src.inference import analyze, get_batching_stats, get_models_status
 import json
 from datetime import datetime, timedelta
-from src.get_color import get_image_colors
-import imagehash
-from PIL import Image
+from src import user_store, wardrobe_store
+from src.image_ingest import UploadRejected, ingest_upload
 from werkzeug.security import generate_password_hash, check_password_hash
 from flask import session
 import toml
-from src.weather import get_datecity_forecast, get_weather_json
-from src.get_color import get_image_colors
+from src.weather import (
+    get_trip_forecast,
+    get_upstream_stats,
+    get_weather_cache_stats,
+    get_weather_json,
+)
 
 config_path = os.path.join("config", "config.toml")
 config = toml.load(config_path)
@@ -51,6 +54,10 @@ config["weather"]["api_key"] = (
 
 
 app = Flask(__name__)
+# X-Forwarded-For is only trusted for the configured number of proxy hops
+trusted_proxy_hops = config.get("proxy", {}).get("trusted_hops", 0)
+if trusted_proxy_hops:
+    app.wsgi_app = ProxyFix(app.wsgi_app, x_for=trusted_proxy_hops)
 CORS(
     app,
     supports_credentials=True,
@@ -104,6 +111,14 @@ def reset_password_page():
     return render_template("reset_password.html")
 
 
+def get_session_gender():
+    """Gender cached in the session at login; looked up once for older sessions."""
+    if "gender" not in session:
+        user = user_store.get_user_by_id(session["user_id"])
+        session["gender"] = user.get("gender", "") if user else ""
+    return session["gender"]
+
+
 @app.route("/recommendation")
 def recommendation():
     # ✅ SAFE session check
@@ -114,16 +129,7 @@ def recommendation():
         # User not logged in → redirect to login
         return redirect("/")
 
-    gender = ""
-
-    # Look up gender from users.csv
-    if os.path.exists(users_csv):
-        with open(users_csv, mode="r", newline="") as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                if row["user_id"] == user_id:
-                    gender = row.get("gender", "")
-                    break
+    gender = get_session_gender()
 
     return render_template(
         "instant_recommendations.html",
@@ -138,16 +144,7 @@ def recommendation():
 def chatbot():
     user_id = session["user_id"]
     username = session.get("username", "")
-    gender = ""
-
-    # Look up gender from users.csv
-    if os.path.exists(users_csv):
-        with open(users_csv, mode="r", newline="") as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                if row["user_id"] == user_id:
-                    gender = row.get("gender", "")
-                    break
+    gender = get_session_gender()
 
     return render_template(
         "chatbot.html", username=username, user_id=user_id, gender=gender
@@ -167,36 +164,15 @@ def register():
     if not username or not password:
         return jsonify({"error": "Username and password are required"}), 400
 
-    if os.path.exists(users_csv):
-        with open(users_csv, mode="r") as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                if row["username"].lower() == username.lower():
-                    return (
-                        jsonify(
-                            {
-                                "error": "Username already exists, Please select an unique user name..."
-                            }
-                        ),
-                        400,
-                    )
-
     password_hash = generate_password_hash(password, method="pbkdf2:sha256")
-    file_exists = os.path.isfile(users_csv)
-    with open(users_csv, mode="a", newline="") as f:
-        writer = csv.DictWriter(
-            f, fieldnames=["user_id", "username", "password", "gender"]
-        )
-        if not file_exists:
-            writer.writeheader()
-
-        writer.writerow(
-            {
-                "user_id": user_id,
-                "username": username,
-                "password": password_hash,
-                "gender": gender,
-            }
+    if not user_store.create_user(user_id, username, password_hash, gender):
+        return (
+            jsonify(
+                {
+                    "error": "Username already exists, Please select an unique user name..."
+                }
+            ),
+            400,
         )
 
     return jsonify({"message": "User registered successfully", "user_id": user_id}), 200
@@ -211,17 +187,15 @@ def login():
     if not username or not password:
         return jsonify({"error": "Username and password are required"}), 400
 
-    if os.path.exists(users_csv):
-        with open(users_csv, mode="r") as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                if row["username"].lower() == username.lower():
-                    if check_password_hash(row["password"], password):
-                        session["user_id"] = row["user_id"]
-                        session["username"] = username
-                        return jsonify({"message": "Login successful"}), 200
-                    else:
-                        return jsonify({"error": "Invalid password"}), 401
+    user = user_store.get_user_by_username(username)
+    if user:
+        if check_password_hash(user["password"], password):
+            session["user_id"] = user["user_id"]
+            session["username"] = username
+            session["gender"] = user.get("gender") or ""
+            return jsonify({"message": "Login successful"}), 200
+        else:
+            return jsonify({"error": "Invalid password"}), 401
 
     return jsonify({"error": "User not found"}), 404
 
@@ -241,42 +215,13 @@ def reset_password():
     if not username or not new_password:
         return jsonify({"error": "Username and new password are required"}), 400
 
-    updated = False
-    updated_rows = []
-
-    if os.path.exists(users_csv):
-        with open(users_csv, mode="r", newline="") as f:
-            reader = list(csv.DictReader(f))
-            for row in reader:
-                if row["username"].lower() == username.lower():
-                    row["password_hash"] = generate_password_hash(
-                        new_password, method="pbkdf2:sha256"
-                    )
-                    updated = True
-                updated_rows.append(row)
-
-    if updated:
-        with open(users_csv, mode="w", newline="") as f:
-            writer = csv.DictWriter(
-                f, fieldnames=["user_id", "username", "password", "gender"]
-            )
-            writer.writeheader()
-            writer.writerows(updated_rows)
+    password_hash = generate_password_hash(new_password, method="pbkdf2:sha256")
+    if user_store.set_password(username, password_hash):
         return jsonify({"message": "Password reset successful"}), 200
     else:
         return jsonify({"error": "Username not found"}), 404
 
 
-def get_image_hash(image_path):
-    """
-    Generate perceptual hash (pHash) for a given image.
-    Returns the hash as a string.
-    """
-    img = Image.open(image_path)
-    hash_value = imagehash.phash(img)
-    return str(hash_value)
-
-
 @app.route("/analyze_clothing", methods=["POST"])
 def analyze_clothing():
 
@@ -299,39 +244,29 @@ def analyze_clothing():
     os.makedirs(user_upload_folder, exist_ok=True)
     filepath = os.path.join(user_upload_folder, filename)
 
-    # Save temporarily to compute hash
-    file.save(filepath)
-    new_hash = get_image_hash(filepath)
-
-    csv_files = [config["paths"]["top_wear_csv"], config["paths"]["bottom_wear_csv"]]
-
-    for csv_file in csv_files:
-        if os.path.exists(csv_file):
-            with open(csv_file, mode="r", newline="") as f:
-                reader = csv.DictReader(f)
-                for row in reader:
-                    existing_hash = row.get("image_hash")
-                    if existing_hash:
-                        # Compare using Hamming distance
-                        if (
-                            imagehash.hex_to_hash(existing_hash)
-                            - imagehash.hex_to_hash(new_hash)
-                            <= 1
-                        ):
-                            os.remove(filepath)  # clean up temp file
-                            return (
-                                jsonify(
-                                    {
-                                        "error": "A visually similar image already exists in the system"
-                                    }
-                                ),
-                                400,
-                            )
+    # Validate and hash the upload in memory; nothing touches disk until it passes
+    try:
+        upload = ingest_upload(file, name=filename)
+    except UploadRejected as e:
+        return jsonify({"error": str(e)}), e.status
+    new_hash = upload.phash
+
+    if wardrobe_store.find_similar_images(new_hash, session["user_id"]):
+        return (
+            jsonify(
+                {
+                    "error": "A visually similar image already exists in the system"
+                }
+            ),
+            400,
+        )
+
+    upload.persist(filepath)
 
     try:
         # Process the image (your existing logic)
-        result = get_all_attribute_predictions(filepath, clothing_type)
-        colors = get_image_colors(filepath)
+        # One background-removal pass; attributes and colors run in parallel
+        result, colors = analyze(upload, clothing_type)
 
         result["primary_color_name"] = colors["primary_color_name"]
         result["secondary_color_name"] = colors["secondary_color_name"]
@@ -364,29 +299,18 @@ def save_attributes():
     else:
         row, desired_order = bottom_wear_save_attributes(current_user_id, data)
 
-     # Select CSV file
-    csv_file = (
-    config["paths"]["top_wear_csv"]
-        if clothing_type.lower() == "top"
-        else config["paths"]["bottom_wear_csv"]
-    )
-    file_exists = os.path.isfile(csv_file)
     # Keep only fields present
     fieldnames = [field for field in desired_order if field in row]
 
-    # Write to CSV
+    # Write to the wardrobe store
     try:
-        with open(csv_file, mode="a", newline="") as file:
-            writer = csv.DictWriter(file, fieldnames=fieldnames)
-            if not file_exists:
-                writer.writeheader()
-            writer.writerow(row)
+        wardrobe_store.add_item(row, fieldnames)
 
         display_name = generate_item_name(attributes)
         return jsonify(
             {
                 "status": "success",
-                "message": "Attributes saved to CSV",
+                "message": "Attributes saved",
                 "display_name": display_name,
             }
         )
@@ -453,42 +377,34 @@ def generate_item_name(attributes):
     return display_name if display_name else "Stylish Outfit"
 
 
-def load_wardrobe_items_from_csv(csv_file, current_user_id, current_user):
+def load_wardrobe_items(clothing_type, current_user_id, current_user):
     wardrobe_items = []
 
-    if not os.path.isfile(csv_file):
-        return wardrobe_items
-
-    with open(csv_file, mode="r", newline="") as file:
-        reader = csv.DictReader(file)
-        for row in reader:
-            if row.get("user_id") != current_user_id:
-                continue  # only include current user's items
-
-            image_id = row.get("image_id")
-            clothing_type = row.get("clothing_type")
-            attributes = {
-                key: row[key]
-                for key in row
-                if key
-                not in [
-                    "username",
-                    "image_id",
-                    "clothing_type",
-                    "timestamp",
-                    "warmth_index",
-                    "breathability_score",
-                ]
-            }
-            attributes = {k: v for k, v in attributes.items() if k is not None}
-            item = {
-                "image_id": image_id,
-                "clothing_type": clothing_type,
-                "display_name": generate_item_name(attributes),
-                "image_url": f"http://127.0.0.1:5002/uploads/{current_user}/{image_id}",
-                "attributes": attributes,
-            }
-            wardrobe_items.append(item)
+    for row in wardrobe_store.get_user_items(current_user_id, clothing_type):
+        image_id = row.get("image_id")
+        clothing_type = row.get("clothing_type")
+        attributes = {
+            key: row[key]
+            for key in row
+            if key
+            not in [
+                "username",
+                "image_id",
+                "clothing_type",
+                "timestamp",
+                "warmth_index",
+                "breathability_score",
+            ]
+        }
+        attributes = {k: v for k, v in attributes.items() if k is not None}
+        item = {
+            "image_id": image_id,
+            "clothing_type": clothing_type,
+            "display_name": generate_item_name(attributes),
+            "image_url": f"http://127.0.0.1:5002/uploads/{current_user}/{image_id}",
+            "attributes": attributes,
+        }
+        wardrobe_items.append(item)
 
     wardrobe_items.reverse()
     return wardrobe_items
@@ -503,14 +419,8 @@ def get_combined_wardrobe_items():
     current_user_id = session["user_id"]
     current_user = session["username"]
 
-    top_csv = config["paths"]["top_wear_csv"]
-    bottom_csv = config["paths"]["bottom_wear_csv"]
-
-
-    top_items = load_wardrobe_items_from_csv(top_csv, current_user_id, current_user)
-    bottom_items = load_wardrobe_items_from_csv(
-        bottom_csv, current_user_id, current_user
-    )
+    top_items = load_wardrobe_items("top", current_user_id, current_user)
+    bottom_items = load_wardrobe_items("bottom", current_user_id, current_user)
 
     return jsonify(top_items + bottom_items)
 
@@ -526,9 +436,7 @@ def delete_item(image_id):
         return jsonify({"error": "Unauthorized: Please log in"}), 401
 
     current_user = session["username"]
-
-    top_csv = config["paths"]["top_wear_csv"]
-    bottom_csv = config["paths"]["bottom_wear_csv"]
+    current_user_id = session["user_id"]
 
     try:
         user_upload_folder = os.path.join(UPLOAD_FOLDER, current_user)
@@ -537,19 +445,7 @@ def delete_item(image_id):
         if os.path.exists(image_path):
             os.remove(image_path)
 
-        for csv_file in [top_csv, bottom_csv]:
-            if os.path.exists(csv_file):
-                with open(csv_file, mode="r", newline="") as file:
-                    reader = list(csv.DictReader(file))
-                    updated_rows = [
-                        row for row in reader if row["image_id"] != image_id
-                    ]
-                    fieldnames = reader[0].keys() if reader else []
-
-                with open(csv_file, mode="w", newline="") as file:
-                    writer = csv.DictWriter(file, fieldnames=fieldnames)
-                    writer.writeheader()
-                    writer.writerows(updated_rows)
+        wardrobe_store.delete_item(current_user_id, image_id)
 
         return (
             jsonify(
@@ -566,19 +462,58 @@ def delete_item(image_id):
         return jsonify({"status": "error", "message": str(e)}), 500
 
 
+def get_client_ip():
+    # Socket address, or the client address ProxyFix took from the trusted proxies
+    return request.remote_addr
+
+
+def get_weather_for_request():
+    """Weather for the caller: browser lat/lon if sent, else their IP location."""
+    return get_weather_json(
+        client_ip=get_client_ip(),
+        latitude=request.args.get("lat"),
+        longitude=request.args.get("lon"),
+    )
+
+
 @app.route("/api/weather")
 def weather_api():
     if "user_id" not in session:
         return jsonify({"error": "Unauthorized"}), 401
 
     try:
-        weather_data = get_weather_json()
+        weather_data = get_weather_for_request()
         return jsonify(weather_data)
     except Exception as e:
         print("Weather API error:", e)
         return jsonify({"error": "Failed to fetch weather"}), 500
 
 
+@app.route("/api/weather/cache_stats")
+def weather_cache_stats():
+    if "user_id" not in session:
+        return jsonify({"error": "Unauthorized"}), 401
+
+    return jsonify(
+        {"caches": get_weather_cache_stats(), "circuit_breakers": get_upstream_stats()}
+    )
+
+
+@app.route("/health/ready")
+def readiness():
+    # Load balancer probe: no traffic until the attribute models are loaded and warm
+    status = get_models_status()
+    return jsonify(status), 200 if status["ready"] else 503
+
+
+@app.route("/api/attributes/batch_stats")
+def attribute_batch_stats():
+    if "user_id" not in session:
+        return jsonify({"error": "Unauthorized"}), 401
+
+    return jsonify({"batchers": get_batching_stats()})
+
+
 
 @app.route("/api/instant-clothing-recommendations")
 def clothing_recommendations():
@@ -588,7 +523,7 @@ def clothing_recommendations():
     current_user_id = session["user_id"]
 
     try:
-        weather_data = get_weather_json()
+        weather_data = get_weather_for_request()
 
         # ✅ SAFE weather handling
         weather_prediction = weather_data.get("prediction")
@@ -753,16 +688,16 @@ def plan_trip():
         # Initialize LLM
         llm = LLMInvoke()
 
+        # Weather forecast and wardrobe items for every day in one round trip
+        forecasts = get_trip_forecast(location, parsed_dates, current_user_id)
+
         recommendations = []
         for date_str in parsed_dates:
             # Find the event for this date
             event_obj = next(e for e in events if e["date"] == date_str)
             event = event_obj["event"]
 
-            # Get weather forecast and wardrobe items
-            rec = get_datecity_forecast(location, date_str, current_user_id, event)
-            if isinstance(rec, str):
-                rec = json.loads(rec)
+            rec = forecasts.get(date_str, {})
 
             top_wear_items = rec.get("top_wear_items", [])
             bottom_wear_items = rec.get("bottom_wear_items", [])
@@ -0,0 +1,152 @@
+"""
+Compare the Keras and ONNX Runtime attribute model backends.
+
+Each backend runs in a fresh process over the same images and reports p50/p99
+latency for one image through all heads (top + bottom) and the process's peak
+RSS. The predicted labels of both backends are then compared head by head.
+
+Export the ONNX models first:
+    python -m models_factory.export_attribute_models_onnx
+
+Usage (from the project root):
+    python -m benchmarks.attribute_backend_benchmark [image_or_dir ...] [--runs 20]
+"""
+
+import argparse
+import multiprocessing
+import os
+import resource
+import time
+import numpy as np
+import toml
+
+from src.attribute_backends import (
+    bottom_wear_attribute_names,
+    bottom_wear_encoder_files,
+    bottom_wear_model_files,
+    load_attribute_models,
+    top_wear_attribute_names,
+    top_wear_encoder_files,
+    top_wear_model_files,
+)
+from src.prepared_image import PreparedImage
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CONFIG_PATH = os.path.join(BASE_DIR, "config", "config.toml")
+config = toml.load(CONFIG_PATH)
+attribute_config = config["attribute_models"]
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".webp")
+
+
+def collect_images(sources, limit):
+    paths = []
+    for source in sources:
+        if os.path.isdir(source):
+            for root, _, files in os.walk(source):
+                paths.extend(
+                    os.path.join(root, f)
+                    for f in sorted(files)
+                    if f.lower().endswith(IMAGE_EXTENSIONS)
+                )
+        else:
+            paths.append(source)
+    return paths[:limit]
+
+
+def run_backend(backend, paths, runs, queue):
+    base_path = attribute_config["model_path"]
+    options = dict(
+        backend=backend,
+        onnx_path=attribute_config.get("onnx_model_path"),
+        intra_op_threads=attribute_config.get("onnx_intra_op_threads", 1),
+        inter_op_threads=attribute_config.get("onnx_inter_op_threads", 1),
+    )
+    top = load_attribute_models(
+        top_wear_model_files, top_wear_encoder_files, base_path, **options
+    )
+    bottom = load_attribute_models(
+        bottom_wear_model_files, bottom_wear_encoder_files, base_path, **options
+    )
+    heads = list(zip(top[1], top_wear_attribute_names)) + list(
+        zip(bottom[1], bottom_wear_attribute_names)
+    )
+
+    batches = [
+        np.expand_dims(PreparedImage.from_path(p).attribute_input(), axis=0)
+        for p in paths
+    ]
+    # First call traces the tf.function / warms the sessions
+    top[2].predict(batches[0])
+    bottom[2].predict(batches[0])
+
+    latencies = []
+    labels = []
+    for batch in batches:
+        for _ in range(runs):
+            start = time.perf_counter()
+            probs = top[2].predict(batch) + bottom[2].predict(batch)
+            latencies.append(time.perf_counter() - start)
+        labels.append(
+            {
+                name: None
+                if p is None or encoder is None
+                else str(encoder.inverse_transform([int(np.argmax(p[0]))])[0])
+                for p, (encoder, name) in zip(probs, heads)
+            }
+        )
+
+    peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    queue.put((latencies, labels, peak_kb))
+
+
+def measure(backend, paths, runs):
+    ctx = multiprocessing.get_context("spawn")
+    queue = ctx.Queue()
+    proc = ctx.Process(target=run_backend, args=(backend, paths, runs, queue))
+    proc.start()
+    result = queue.get()
+    proc.join()
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Keras vs ONNX attribute backends")
+    parser.add_argument("sources", nargs="*", default=["uploads"])
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--limit", type=int, default=50)
+    args = parser.parse_args()
+
+    paths = collect_images(args.sources, args.limit)
+    if not paths:
+        raise SystemExit("No images found; pass image files or directories")
+
+    results = {backend: measure(backend, paths, args.runs) for backend in ("keras", "onnx")}
+
+    print(f"images={len(paths)} runs/image={args.runs}")
+    for backend, (latencies, _, peak_kb) in results.items():
+        ms = np.array(latencies) * 1000
+        print(
+            f"{backend:>5}: p50 {np.percentile(ms, 50):7.2f} ms | "
+            f"p99 {np.percentile(ms, 99):7.2f} ms | peak RSS {peak_kb / 1024:7.0f} MB"
+        )
+
+    keras_labels, onnx_labels = results["keras"][1], results["onnx"][1]
+    mismatches = 0
+    for name in top_wear_attribute_names + bottom_wear_attribute_names:
+        pairs = [(k[name], o[name]) for k, o in zip(keras_labels, onnx_labels)]
+        pairs = [(k, o) for k, o in pairs if k is not None and o is not None]
+        if not pairs:
+            print(f"{name:>22}: model not available")
+            continue
+        agree = sum(k == o for k, o in pairs)
+        mismatches += len(pairs) - agree
+        print(f"{name:>22}: label agreement {agree}/{len(pairs)}")
+
+    if mismatches:
+        raise SystemExit(f"Parity check failed: {mismatches} label mismatches")
+    print("Parity check passed")
+
+
+if __name__ == "__main__":
+    main()
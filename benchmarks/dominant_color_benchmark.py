@@ -0,0 +1,169 @@
+"""
+Parity gate for the histogram dominant-color engine against per-pixel KMeans.
+
+The checked-in reference set (benchmarks/data/dominant_color_reference.npz)
+holds foreground pixels from 55 wardrobe photos together with the top two
+colors the original engine, sklearn KMeans(5, random_state=42) over every
+pixel, picked for each. The histogram engine names both colors and the
+script exits 1 if fewer than --min-agreement of the names match.
+
+The agreement of KMeans with itself under random_state=43 is printed as the
+ceiling: KMeans(5) splits single-colored garments arbitrarily, so no
+replacement can be expected to beat it. On the checked-in set it is 83/110
+names; the histogram engine gets 82/110 (primary color 44/55).
+
+Reference images are sampled down to 3072 pixels to keep the file small, so
+their timings favour per-pixel KMeans; pass real images (rembg foregrounds of
+up to 65k pixels) for representative timings.
+
+With image paths/directories the same comparison also runs on foreground
+pixels extracted with rembg (informational, no gate).
+
+Usage (from the project root):
+    python -m benchmarks.dominant_color_benchmark [image_or_dir ...] [--min-agreement 0.7]
+    python -m benchmarks.dominant_color_benchmark --write-reference image_or_dir ...
+"""
+
+import argparse
+import os
+import sys
+import time
+import numpy as np
+from sklearn.cluster import KMeans
+
+from benchmarks.attribute_backend_benchmark import collect_images
+from src.get_color import closest_xkcd_color_names, extract_clothing_pixels, get_top_two_colors
+from src.prepared_image import PreparedImage
+
+REFERENCE_PATH = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "data", "dominant_color_reference.npz"
+)
+# Pixels kept per reference image (a seeded random sample)
+REFERENCE_PIXELS = 3072
+
+
+def kmeans_colors(pixels, random_state):
+    kmeans = KMeans(n_clusters=5, random_state=random_state)
+    labels = kmeans.fit_predict(pixels)
+    _, counts = np.unique(labels, return_counts=True)
+    order = np.argsort(counts)[::-1][:2]
+    return [tuple(kmeans.cluster_centers_[i].astype(int)) for i in order]
+
+
+def best_time(fn, repeats):
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return result, best
+
+
+def compare(cases, repeats, verbose=False):
+    """
+    cases: (label, pixels, reference colors) tuples.
+
+    Returns:
+        (engine name matches, KMeans seed 43 name matches, primary matches,
+         total names, engine times, reference times)
+    """
+    agree = self_agree = primary = total = 0
+    engine_times, reference_times = [], []
+    for label, pixels, reference in cases:
+        fast, engine_t = best_time(
+            lambda: get_top_two_colors(pixels, engine="histogram"), repeats
+        )
+        _, reference_t = best_time(lambda: kmeans_colors(pixels, 42), 1)
+        engine_times.append(engine_t)
+        reference_times.append(reference_t)
+
+        reference_names = closest_xkcd_color_names(reference)
+        fast_names = closest_xkcd_color_names(fast)
+        other_names = closest_xkcd_color_names(kmeans_colors(pixels, 43))
+        agree += sum(a == b for a, b in zip(reference_names, fast_names))
+        self_agree += sum(a == b for a, b in zip(reference_names, other_names))
+        primary += reference_names[0] == fast_names[0]
+        total += 2
+        if verbose:
+            print(f"{label}: kmeans {reference_names} | histogram {fast_names}")
+    return agree, self_agree, primary, total, engine_times, reference_times
+
+
+def report(title, results):
+    agree, self_agree, primary, total, engine_times, reference_times = results
+    print(
+        f"{title}: images={total // 2} | name agreement: histogram {agree}/{total} "
+        f"(primary {primary}/{total // 2}), kmeans seed 43 vs 42 {self_agree}/{total}"
+    )
+    print(
+        f"  median time: kmeans {np.median(reference_times) * 1000:.1f} ms | "
+        f"histogram {np.median(engine_times) * 1000:.2f} ms"
+    )
+
+
+def write_reference(paths, path=REFERENCE_PATH):
+    """
+    Build the reference set: the central half of each image's 256x256 color
+    input (mostly garment in wardrobe photos; no rembg model needed), sampled
+    to REFERENCE_PIXELS pixels, with the per-pixel KMeans colors.
+    """
+    rng = np.random.default_rng(0)
+    pixels, references, sources = [], [], []
+    for image_path in paths:
+        rgba = np.asarray(PreparedImage.from_path(image_path).color_input())
+        h, w = rgba.shape[:2]
+        center = rgba[h // 4 : 3 * h // 4, w // 4 : 3 * w // 4, :3].reshape(-1, 3)
+        sample = center[rng.choice(len(center), REFERENCE_PIXELS, replace=False)]
+        pixels.append(sample)
+        references.append(kmeans_colors(sample, 42))
+        sources.append(os.path.basename(image_path))
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    np.savez_compressed(
+        path,
+        pixels=np.stack(pixels).astype(np.uint8),
+        reference_colors=np.array(references, dtype=np.int64),
+        sources=np.array(sources),
+    )
+    print(f"Wrote {len(pixels)} reference images to {path}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Dominant color engine parity gate")
+    parser.add_argument("sources", nargs="*")
+    parser.add_argument("--reference", default=REFERENCE_PATH)
+    parser.add_argument("--min-agreement", type=float, default=0.7)
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--limit", type=int, default=50)
+    parser.add_argument("--write-reference", action="store_true")
+    args = parser.parse_args()
+
+    if args.write_reference:
+        paths = collect_images(args.sources or ["uploads"], args.limit)
+        if not paths:
+            raise SystemExit("No images found; pass image files or directories")
+        write_reference(paths, args.reference)
+        return
+
+    if args.sources:
+        cases = []
+        for path in collect_images(args.sources, args.limit):
+            pixels = extract_clothing_pixels(path)
+            if len(pixels) >= 5:
+                cases.append((path, pixels, kmeans_colors(pixels, 42)))
+        if cases:
+            report("rembg foreground", compare(cases, args.repeats, verbose=True))
+
+    reference = np.load(args.reference)
+    cases = list(zip(reference["sources"], reference["pixels"], reference["reference_colors"]))
+    results = compare(cases, args.repeats)
+    report("reference set", results)
+
+    agreement = results[0] / results[3]
+    if agreement < args.min_agreement:
+        print(f"Name agreement {agreement:.3f} is below --min-agreement {args.min_agreement}")
+        sys.exit(1)
+    print(f"Name agreement {agreement:.3f} >= {args.min_agreement}")
+
+
+if __name__ == "__main__":
+    main()
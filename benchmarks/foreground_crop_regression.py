@@ -0,0 +1,92 @@
+"""
+Accuracy gate for [attribute_models] crop_to_foreground.
+
+Runs a held-out labelled image set through the configured attribute models
+twice: on the full frame (what the models were trained on) and on the
+clothing's bounding box from the rembg mask, grown by crop_padding. It
+reports per-head accuracy for both and exits non-zero if any head loses more
+than --max-drop accuracy when cropped, or if no head could be evaluated.
+
+The labels CSV has the same format as for benchmarks.quantization_regression.
+
+Usage (from the project root):
+    python -m benchmarks.foreground_crop_regression \
+        --labels held_out.csv --images held_out/ [--max-drop 0.01]
+"""
+
+import argparse
+import sys
+import numpy as np
+import pandas as pd
+
+from benchmarks.quantization_regression import load_head_data
+from src.AttributePred import (
+    attribute_models,
+    bottom_wear_attribute_names,
+    crop_padding,
+    cropped_attribute_input,
+    top_wear_attribute_names,
+)
+
+GROUPS = [("top", top_wear_attribute_names), ("bottom", bottom_wear_attribute_names)]
+
+
+def accuracy(model, X, y):
+    probs = model.predict(X, verbose=0)
+    return float(np.mean(np.argmax(probs, axis=1) == y))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Foreground crop accuracy gate")
+    parser.add_argument("--labels", required=True)
+    parser.add_argument("--images", required=True)
+    parser.add_argument("--max-drop", type=float, default=0.01)
+    args = parser.parse_args()
+
+    df = pd.read_csv(args.labels)
+    id_column = "Image_ID" if "Image_ID" in df.columns else "image_id"
+    print(f"crop_padding = {crop_padding}")
+
+    failures = []
+    evaluated = 0
+    for group_name, attribute_names in GROUPS:
+        group = attribute_models.get(group_name)
+        if group is None:
+            print(f"{group_name}: skipped (models failed to load)")
+            continue
+        for name, model, encoder in zip(attribute_names, group.models, group.encoders):
+            if model is None or encoder is None:
+                print(f"{name}: skipped (model or encoder not available)")
+                continue
+            X_full, y = load_head_data(df, id_column, args.images, name, encoder)
+            if X_full is None:
+                print(f"{name}: skipped (no labelled images)")
+                continue
+            X_crop, _ = load_head_data(
+                df, id_column, args.images, name, encoder, preprocess=cropped_attribute_input
+            )
+
+            evaluated += 1
+            full_acc = accuracy(model, X_full, y)
+            crop_acc = accuracy(model, X_crop, y)
+            drop = full_acc - crop_acc
+            status = "ok"
+            if drop > args.max_drop:
+                status = "FAIL"
+                failures.append(name)
+            print(
+                f"{name} (n={len(y)}): full frame {full_acc:.4f} | "
+                f"cropped {crop_acc:.4f} (drop {drop:+.4f}) | {status}"
+            )
+
+    if not evaluated:
+        print("No head evaluated: check --labels/--images and the attribute models")
+        sys.exit(1)
+    if failures:
+        print(f"Cropping dropped accuracy by more than {args.max_drop}: {', '.join(failures)}")
+        sys.exit(1)
+    print(f"No accuracy regression from cropping ({evaluated} heads)")
+
+
+if __name__ == "__main__":
+    main()
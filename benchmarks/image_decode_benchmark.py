@@ -0,0 +1,134 @@
+"""
+Benchmark full-resolution vs reduced (JPEG draft mode) decoding of uploads.
+
+Each mode runs the analyze_clothing preprocessing (decode, pHash, 128x128
+attribute input, 256x256 color input) in a fresh process. Peak RSS is
+reported with its growth over the process's RSS just before the first decode.
+Without arguments a photo-like 4032x3024 (12MP) test JPEG is generated, in its
+own process so the parent's (inherited) peak RSS stays small.
+
+Usage (from the project root):
+    python -m benchmarks.image_decode_benchmark [photo.jpg ...]
+"""
+
+import io
+import multiprocessing
+import os
+import resource
+import sys
+import tempfile
+import time
+import numpy as np
+from PIL import Image, ImageDraw, ImageFilter
+
+from src.prepared_image import PreparedImage, open_image
+
+
+def make_sample_jpeg(path, size=(4032, 3024), strip_rows=256):
+    """
+    Blurred overlapping shapes drawn at 1/8 scale and upsampled, plus mild
+    grain: smooth regions and edges like a photo, unlike noise or a bare
+    gradient (whose pHash sits on the median and flips under any resampling).
+    """
+    rng = np.random.default_rng(42)
+    small = Image.new("RGB", (size[0] // 8, size[1] // 8), (200, 195, 185))
+    draw = ImageDraw.Draw(small)
+    for _ in range(12):
+        x0, y0 = rng.integers(0, small.width), rng.integers(0, small.height)
+        w, h = rng.integers(40, small.width // 2), rng.integers(40, small.height // 2)
+        fill = tuple(int(c) for c in rng.integers(0, 256, 3))
+        if rng.random() < 0.5:
+            draw.ellipse([x0, y0, x0 + w, y0 + h], fill=fill)
+        else:
+            draw.rectangle([x0, y0, x0 + w, y0 + h], fill=fill)
+    small = small.filter(ImageFilter.GaussianBlur(2))
+    pixels = np.asarray(small.resize(size, Image.BICUBIC)).copy()
+
+    # Grain in uint8-sized strips, never a full-frame float array
+    for top in range(0, size[1], strip_rows):
+        strip = pixels[top : top + strip_rows].astype(np.int16)
+        strip += rng.integers(-6, 7, strip.shape, dtype=np.int16)
+        pixels[top : top + strip_rows] = np.clip(strip, 0, 255)
+    Image.fromarray(pixels).save(path, "JPEG", quality=90)
+
+
+def prepare(path, reduced):
+    with open(path, "rb") as f:
+        data = f.read()
+    prepared = PreparedImage(open_image(io.BytesIO(data), reduced=reduced))
+    prepared.phash
+    prepared.attribute_input()
+    prepared.color_input()
+    return prepared
+
+
+def run_mode(paths, reduced, repeats, queue):
+    baseline_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    timings = []
+    hashes = []
+    for path in paths:
+        best = float("inf")
+        for _ in range(repeats):
+            start = time.perf_counter()
+            prepared = prepare(path, reduced)
+            best = min(best, time.perf_counter() - start)
+        timings.append(best)
+        hashes.append((prepared.phash, prepared.image.size))
+    peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    queue.put((timings, hashes, peak_kb, peak_kb - baseline_kb))
+
+
+def generate_sample(path):
+    ctx = multiprocessing.get_context("spawn")
+    proc = ctx.Process(target=make_sample_jpeg, args=(path,))
+    proc.start()
+    proc.join()
+    if proc.exitcode != 0:
+        raise SystemExit("Could not generate the sample JPEG")
+
+
+def measure(paths, reduced, repeats):
+    ctx = multiprocessing.get_context("spawn")
+    queue = ctx.Queue()
+    proc = ctx.Process(target=run_mode, args=(paths, reduced, repeats, queue))
+    proc.start()
+    result = queue.get()
+    proc.join()
+    return result
+
+
+def hamming(a, b):
+    return bin(int(a, 16) ^ int(b, 16)).count("1")
+
+
+def main(paths, repeats=3):
+    tmpdir = None
+    if not paths:
+        tmpdir = tempfile.TemporaryDirectory()
+        sample = os.path.join(tmpdir.name, "sample_12mp.jpg")
+        generate_sample(sample)
+        paths = [sample]
+        print("Synthetic sample: pass real photos for representative pHash drift")
+
+    full_t, full_h, full_rss, full_growth = measure(paths, reduced=False, repeats=repeats)
+    red_t, red_h, red_rss, red_growth = measure(paths, reduced=True, repeats=repeats)
+
+    for path, ft, rt, (fh, fsize), (rh, rsize) in zip(
+        paths, full_t, red_t, full_h, red_h
+    ):
+        print(
+            f"{os.path.basename(path)}: full {fsize[0]}x{fsize[1]} {ft * 1000:8.1f} ms | "
+            f"reduced {rsize[0]}x{rsize[1]} {rt * 1000:8.1f} ms | "
+            f"speedup {ft / rt:5.1f}x | pHash distance {hamming(fh, rh)}"
+        )
+    print(
+        f"peak RSS: full {full_rss / 1024:.0f} MB (+{full_growth / 1024:.0f} MB decoding) | "
+        f"reduced {red_rss / 1024:.0f} MB (+{red_growth / 1024:.0f} MB decoding)"
+    )
+
+    if tmpdir is not None:
+        tmpdir.cleanup()
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,128 @@
+"""
+Resident memory per web worker: in-process models vs the model-server sidecar.
+
+Starts N worker processes that import the app's inference layer and handle
+one upload each, first with the models loaded in every worker, then with a
+shared `python -m src.model_server` sidecar. Prints each worker's RSS and the
+total, including the sidecar.
+
+Usage (from the project root):
+    python -m benchmarks.model_server_rss_benchmark [--workers 4] [--image photo.jpg]
+"""
+
+import argparse
+import io
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import numpy as np
+from PIL import Image
+
+
+def rss_mb(pid="self"):
+    with open(f"/proc/{pid}/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+
+def sample_jpeg():
+    pixels = (np.random.default_rng(0).random((1024, 768, 3)) * 255).astype(np.uint8)
+    buf = io.BytesIO()
+    Image.fromarray(pixels).save(buf, "JPEG", quality=90)
+    return buf.getvalue()
+
+
+WORKER_SCRIPT = """
+import io, sys, time
+from src import inference
+from src.image_ingest import IngestedImage
+from src.prepared_image import open_image
+
+data = open(sys.argv[1], "rb").read()
+upload = IngestedImage(data, open_image(io.BytesIO(data)), "JPEG", name="sample.jpg")
+while not inference.get_models_status().get("ready"):
+    time.sleep(0.2)
+inference.predict_attributes(upload, "top")
+inference.predict_colors(upload)
+with open("/proc/self/status") as f:
+    rss = [l for l in f if l.startswith("VmRSS:")][0].split()[1]
+print(int(rss) / 1024)
+"""
+
+
+def run_workers(count, image_path, env):
+    procs = [
+        subprocess.Popen(
+            [sys.executable, "-c", WORKER_SCRIPT, image_path],
+            env=env,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True,
+        )
+        for _ in range(count)
+    ]
+    return [float(p.communicate()[0].strip().splitlines()[-1]) for p in procs]
+
+
+def wait_for_socket(path, proc, timeout=300):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if os.path.exists(path):
+            return
+        if proc.poll() is not None:
+            raise SystemExit("model server exited during startup")
+        time.sleep(0.2)
+    raise SystemExit("model server did not start in time")
+
+
+def report(label, workers, extra=0.0):
+    print(
+        f"{label:>10}: per worker {', '.join(f'{w:.0f}' for w in workers)} MB | "
+        f"mean {np.mean(workers):.0f} MB | total {sum(workers) + extra:.0f} MB"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="RSS per worker with and without the sidecar")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--image")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        image_path = args.image
+        if image_path is None:
+            image_path = os.path.join(tmp, "sample.jpg")
+            with open(image_path, "wb") as f:
+                f.write(sample_jpeg())
+
+        env = {k: v for k, v in os.environ.items() if k != "MODEL_SERVER_SOCKET"}
+        in_process = run_workers(args.workers, image_path, env)
+
+        socket_path = os.path.join(tmp, "models.sock")
+        server = subprocess.Popen(
+            [sys.executable, "-m", "src.model_server", "--socket", socket_path],
+            env=env,
+            stdout=subprocess.DEVNULL,
+        )
+        try:
+            wait_for_socket(socket_path, server)
+            sidecar = run_workers(
+                args.workers, image_path, dict(env, MODEL_SERVER_SOCKET=socket_path)
+            )
+            server_rss = rss_mb(server.pid)
+        finally:
+            server.terminate()
+            server.wait()
+
+    print(f"workers={args.workers}")
+    report("in-process", in_process)
+    report("sidecar", sidecar, extra=server_rss)
+    print(f"{'':>10}  model server {server_rss:.0f} MB")
+
+
+if __name__ == "__main__":
+    main()
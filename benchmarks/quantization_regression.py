@@ -0,0 +1,153 @@
+"""
+Accuracy-regression gate for the quantized ONNX attribute models.
+
+Runs a held-out labelled image set through the float32 export and each
+quantized variant. For every head it reports accuracy, latency speedup and
+model-size reduction. It exits non-zero if any head loses more than
+--max-drop accuracy, if a requested quantized variant is missing for an
+evaluated head, or if no head could be evaluated at all.
+
+The labels CSV needs an image id column (Image_ID or image_id) and one column
+per attribute, named as in the training data / wardrobe CSVs
+(sleeve_length, neckline, upper_clothing_covering_navel, ...).
+
+Usage (from the project root):
+    python -m benchmarks.quantization_regression \
+        --labels held_out.csv --images held_out/ [--precision int8 fp16] [--max-drop 0.01]
+"""
+
+import argparse
+import os
+import sys
+import time
+import joblib
+import numpy as np
+import pandas as pd
+import toml
+
+from src.attribute_backends import (
+    OnnxAttributeModel,
+    attribute_label_columns,
+    bottom_wear_attribute_names,
+    bottom_wear_encoder_files,
+    bottom_wear_model_files,
+    onnx_filename,
+    top_wear_attribute_names,
+    top_wear_encoder_files,
+    top_wear_model_files,
+)
+from src.prepared_image import PreparedImage
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CONFIG_PATH = os.path.join(BASE_DIR, "config", "config.toml")
+config = toml.load(CONFIG_PATH)
+attribute_config = config["attribute_models"]
+base_path = attribute_config["model_path"]
+onnx_model_path = attribute_config.get("onnx_model_path", os.path.join(base_path, "onnx"))
+
+HEADS = list(
+    zip(
+        top_wear_attribute_names + bottom_wear_attribute_names,
+        top_wear_model_files + bottom_wear_model_files,
+        top_wear_encoder_files + bottom_wear_encoder_files,
+    )
+)
+
+
+def load_head_data(df, id_column, image_dir, name, encoder, preprocess=None):
+    """
+    Preprocessed images and encoded labels for rows labelled for this head.
+    `preprocess` maps a PreparedImage to the model input (full frame by default).
+    """
+    column = attribute_label_columns[name]
+    if column not in df.columns:
+        return None, None
+    rows = df[df[column].isin(encoder.classes_)]
+
+    images, labels = [], []
+    for image_id, label in zip(rows[id_column], rows[column]):
+        path = os.path.join(image_dir, image_id)
+        if not os.path.exists(path):
+            continue
+        prepared = PreparedImage.from_path(path)
+        images.append(preprocess(prepared) if preprocess else prepared.attribute_input())
+        labels.append(label)
+    if not images:
+        return None, None
+    return np.array(images, dtype=np.float32), encoder.transform(labels)
+
+
+def evaluate(model, X, y, runs):
+    model.predict(X[:1])  # warm-up
+    best = float("inf")
+    for _ in range(runs):
+        start = time.perf_counter()
+        probs = model.predict(X)
+        best = min(best, time.perf_counter() - start)
+    return float(np.mean(np.argmax(probs, axis=1) == y)), best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Quantized model accuracy gate")
+    parser.add_argument("--labels", required=True)
+    parser.add_argument("--images", required=True)
+    parser.add_argument("--precision", nargs="+", default=["int8", "fp16"])
+    parser.add_argument("--max-drop", type=float, default=0.01)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    df = pd.read_csv(args.labels)
+    id_column = "Image_ID" if "Image_ID" in df.columns else "image_id"
+    threads = dict(
+        intra_op_threads=attribute_config.get("onnx_intra_op_threads", 1),
+        inter_op_threads=attribute_config.get("onnx_inter_op_threads", 1),
+    )
+
+    failures, missing = [], []
+    evaluated = 0
+    for name, model_file, encoder_file in HEADS:
+        encoder = joblib.load(os.path.join(base_path, encoder_file))
+        X, y = load_head_data(df, id_column, args.images, name, encoder)
+        fp32_path = os.path.join(onnx_model_path, onnx_filename(model_file))
+        if X is None or not os.path.exists(fp32_path):
+            print(f"{name}: skipped (no labelled images or no fp32 export)")
+            continue
+
+        evaluated += 1
+        fp32_acc, fp32_time = evaluate(OnnxAttributeModel(fp32_path, **threads), X, y, args.runs)
+        fp32_mb = os.path.getsize(fp32_path) / 1e6
+        print(f"{name} (n={len(y)}): fp32 accuracy {fp32_acc:.4f}, {fp32_mb:.1f} MB")
+
+        for precision in args.precision:
+            path = os.path.join(onnx_model_path, onnx_filename(model_file, precision))
+            if not os.path.exists(path):
+                print(f"  {precision}: missing {path} | FAIL")
+                missing.append(f"{name}/{precision}")
+                continue
+            acc, elapsed = evaluate(OnnxAttributeModel(path, **threads), X, y, args.runs)
+            size_mb = os.path.getsize(path) / 1e6
+            drop = fp32_acc - acc
+            status = "ok"
+            if drop > args.max_drop:
+                status = "FAIL"
+                failures.append(f"{name}/{precision}")
+            print(
+                f"  {precision}: accuracy {acc:.4f} (drop {drop:+.4f}) | "
+                f"speedup {fp32_time / elapsed:4.2f}x | "
+                f"size {size_mb:.1f} MB ({fp32_mb / size_mb:.1f}x smaller) | {status}"
+            )
+
+    if not evaluated:
+        print("No head evaluated: check --labels/--images and the fp32 exports")
+        sys.exit(1)
+    if missing:
+        print(f"Quantized models missing: {', '.join(missing)}")
+    if failures:
+        print(f"Accuracy dropped by more than {args.max_drop}: {', '.join(failures)}")
+    if missing or failures:
+        sys.exit(1)
+    print(f"No accuracy regression beyond threshold ({evaluated} heads)")
+
+
+if __name__ == "__main__":
+    main()
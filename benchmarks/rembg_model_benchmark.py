@@ -0,0 +1,89 @@
+"""
+Compare rembg segmentation models for the 256x256 color-extraction input.
+
+Each model runs in a fresh process (so peak RSS is its own) on the same
+images. The report covers session creation time, p50/p99 latency per image,
+peak RSS and the mean foreground-mask IoU against the first model listed.
+
+Usage (from the project root):
+    python -m benchmarks.rembg_model_benchmark [image_or_dir ...] \
+        [--models u2net u2netp silueta] [--runs 5]
+"""
+
+import argparse
+import multiprocessing
+import resource
+import time
+import numpy as np
+
+from benchmarks.attribute_backend_benchmark import collect_images
+from src.prepared_image import PreparedImage
+from src.rembg_sessions import INTER_OP_THREADS, INTRA_OP_THREADS, create_session
+
+
+def run_model(model_name, paths, runs, queue):
+    from rembg import remove
+
+    started = time.perf_counter()
+    session = create_session(model_name, INTRA_OP_THREADS, INTER_OP_THREADS)
+    create_seconds = time.perf_counter() - started
+
+    images = [PreparedImage.from_path(p).color_input() for p in paths]
+    remove(images[0], session=session)  # warm-up
+
+    latencies, masks = [], []
+    for image in images:
+        for _ in range(runs):
+            start = time.perf_counter()
+            result = np.array(remove(image, session=session))
+            latencies.append(time.perf_counter() - start)
+        masks.append(result[:, :, 3] > 100)
+
+    peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    queue.put((create_seconds, latencies, masks, peak_kb))
+
+
+def measure(model_name, paths, runs):
+    ctx = multiprocessing.get_context("spawn")
+    queue = ctx.Queue()
+    proc = ctx.Process(target=run_model, args=(model_name, paths, runs, queue))
+    proc.start()
+    result = queue.get()
+    proc.join()
+    return result
+
+
+def iou(a, b):
+    union = np.logical_or(a, b).sum()
+    return np.logical_and(a, b).sum() / union if union else 1.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="rembg model latency/memory comparison")
+    parser.add_argument("sources", nargs="*", default=["uploads"])
+    parser.add_argument("--models", nargs="+", default=["u2net", "u2netp", "silueta"])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--limit", type=int, default=30)
+    args = parser.parse_args()
+
+    paths = collect_images(args.sources, args.limit)
+    if not paths:
+        raise SystemExit("No images found; pass image files or directories")
+
+    print(f"images={len(paths)} runs/image={args.runs} threads={INTRA_OP_THREADS}/{INTER_OP_THREADS}")
+    reference_masks = None
+    for model_name in args.models:
+        create_seconds, latencies, masks, peak_kb = measure(model_name, paths, args.runs)
+        if reference_masks is None:
+            reference_masks = masks
+        ms = np.array(latencies) * 1000
+        mean_iou = np.mean([iou(a, b) for a, b in zip(masks, reference_masks)])
+        print(
+            f"{model_name:>10}: load {create_seconds:5.2f} s | "
+            f"p50 {np.percentile(ms, 50):7.1f} ms | p99 {np.percentile(ms, 99):7.1f} ms | "
+            f"peak RSS {peak_kb / 1024:6.0f} MB | mask IoU vs {args.models[0]} {mean_iou:.3f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Benchmark the vectorized soft-label engine against the original nested loop.
+
+Usage (from the project root):
+    python -m benchmarks.soft_labels_benchmark
+"""
+
+import time
+import numpy as np
+import pandas as pd
+
+from src.soft_labels import compute_soft_labels
+from src.weather_suitability_clustering import (
+    TOPWEAR_CATEGORICAL_COLS,
+    TOPWEAR_NUMERICAL_COLS,
+    clustering_weather_data_topwear,
+    topwear_cluster_artifact,
+)
+
+
+def compute_soft_labels_loop(X_np, centroids, categorical_cols):
+    """Original row x centroid x feature loop, kept as the reference."""
+    soft_labels = []
+    for row in X_np:
+        distances = []
+        for center in centroids:
+            d = 0
+            for i in range(len(row)):
+                if i in categorical_cols:
+                    d += int(str(row[i]) != str(center[i]))
+                else:
+                    d += (float(row[i]) - float(center[i])) ** 2
+            distances.append(np.sqrt(d))
+        distances = np.array(distances)
+        proximity = 1 / (distances + 1e-6)
+        proximity /= proximity.sum()
+        soft_labels.append(proximity)
+    return np.array(soft_labels)
+
+
+def best_of(fn, repeats):
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main(repeats=5):
+    if topwear_cluster_artifact is None:
+        raise SystemExit("Build the cluster model first (models_factory/topwear_weather_clustering_model.py)")
+
+    df = pd.read_csv(clustering_weather_data_topwear)
+    X_np = np.concatenate(
+        [
+            df[TOPWEAR_NUMERICAL_COLS].astype(float).to_numpy(),
+            df[TOPWEAR_CATEGORICAL_COLS].astype(str).to_numpy(),
+        ],
+        axis=1,
+    )
+    centroids = topwear_cluster_artifact["centroids"]
+    cat_cols = topwear_cluster_artifact["cat_indices"]
+
+    expected = compute_soft_labels_loop(X_np, centroids, cat_cols)
+    actual = compute_soft_labels(X_np, centroids, cat_cols)
+    assert np.allclose(expected, actual), "vectorized result differs from loop"
+
+    print(f"rows={len(X_np)} centroids={len(centroids)} features={X_np.shape[1]}")
+    for label, rows in [("single row", X_np[:1]), ("full dataset", X_np)]:
+        loop_t = best_of(lambda: compute_soft_labels_loop(rows, centroids, cat_cols), repeats)
+        vec_t = best_of(lambda: compute_soft_labels(rows, centroids, cat_cols), repeats)
+        print(
+            f"{label:>12}: loop {loop_t * 1000:9.3f} ms | "
+            f"vectorized {vec_t * 1000:9.3f} ms | speedup {loop_t / vec_t:7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
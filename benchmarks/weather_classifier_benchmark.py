@@ -0,0 +1,54 @@
+"""
+Check the compiled weather fast path against the sklearn pipeline and time both.
+
+Usage (from the project root):
+    python -m benchmarks.weather_classifier_benchmark weather_classification_data.csv
+"""
+
+import argparse
+import time
+import pandas as pd
+
+from src.weather import get_weather_classifier
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("data", help="CSV with the weather classifier input columns")
+    parser.add_argument("--rows", type=int, default=500)
+    args = parser.parse_args()
+
+    classifier = get_weather_classifier()
+    if classifier.compiled is None:
+        raise SystemExit("Fast path could not be compiled for this model")
+
+    df = pd.read_csv(args.data).drop(columns=["Weather Type"], errors="ignore")
+    records = [
+        {k: (v.item() if hasattr(v, "item") else v) for k, v in row.items()}
+        for row in df.head(args.rows).to_dict("records")
+    ]
+
+    start = time.perf_counter()
+    expected = [classifier.pipeline.predict(pd.DataFrame([r]))[0] for r in records]
+    pipeline_t = time.perf_counter() - start
+
+    start = time.perf_counter()
+    single = [classifier.predict_one(r) for r in records]
+    single_t = time.perf_counter() - start
+
+    start = time.perf_counter()
+    batch = classifier.predict_many(records)
+    batch_t = time.perf_counter() - start
+
+    mismatches = sum(a != b for a, b in zip(expected, single)) + sum(
+        a != b for a, b in zip(expected, batch)
+    )
+    n = len(records)
+    print(f"rows={n} mismatches={mismatches}")
+    print(f"pipeline per row : {pipeline_t / n * 1000:8.3f} ms")
+    print(f"fast path per row: {single_t / n * 1000:8.3f} ms")
+    print(f"batch of {n:<8}: {batch_t * 1000:8.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
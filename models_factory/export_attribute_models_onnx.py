@@ -0,0 +1,79 @@
+"""
+Export the clothing attribute models from .keras to ONNX.
+
+Writes one .onnx file per model into [attribute_models] onnx_model_path and
+checks each export against Keras on random inputs. Set
+[attribute_models] backend = "onnx" to serve them.
+
+Usage (from the project root):
+    python -m models_factory.export_attribute_models_onnx [--opset 13]
+"""
+
+import argparse
+import os
+import numpy as np
+import tensorflow as tf
+import tf2onnx
+import toml
+
+from src.attribute_backends import (
+    OnnxAttributeModel,
+    bottom_wear_model_files,
+    onnx_filename,
+    top_wear_model_files,
+)
+from src.prepared_image import ATTRIBUTE_INPUT_SIZE
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CONFIG_PATH = os.path.join(BASE_DIR, "config", "config.toml")
+config = toml.load(CONFIG_PATH)
+base_path = config["attribute_models"]["model_path"]
+onnx_model_path = config["attribute_models"].get(
+    "onnx_model_path", os.path.join(base_path, "onnx")
+)
+
+
+def export_model(model_path, output_path, opset):
+    model = tf.keras.models.load_model(model_path)
+    spec = (tf.TensorSpec((None, *ATTRIBUTE_INPUT_SIZE, 3), tf.float32, name="image"),)
+    tf2onnx.convert.from_keras(
+        model, input_signature=spec, opset=opset, output_path=output_path
+    )
+    return model
+
+
+def check_export(model, output_path, samples=16):
+    rng = np.random.default_rng(0)
+    images = rng.random((samples, *ATTRIBUTE_INPUT_SIZE, 3), dtype=np.float32)
+    expected = model.predict(images, verbose=0)
+    actual = OnnxAttributeModel(output_path).predict(images)
+    max_diff = float(np.max(np.abs(expected - actual)))
+    agreement = float(np.mean(expected.argmax(axis=1) == actual.argmax(axis=1)))
+    return max_diff, agreement
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export attribute models to ONNX")
+    parser.add_argument("--source", default=base_path)
+    parser.add_argument("--output", default=onnx_model_path)
+    parser.add_argument("--opset", type=int, default=13)
+    args = parser.parse_args()
+
+    os.makedirs(args.output, exist_ok=True)
+    for model_file in top_wear_model_files + bottom_wear_model_files:
+        model_path = os.path.join(args.source, model_file)
+        output_path = os.path.join(args.output, onnx_filename(model_file))
+        if not os.path.exists(model_path):
+            print(f"Skipping {model_file}: not found in {args.source}")
+            continue
+
+        model = export_model(model_path, output_path, args.opset)
+        max_diff, agreement = check_export(model, output_path)
+        print(
+            f"{model_file} -> {output_path} "
+            f"(max |diff| {max_diff:.2e}, argmax agreement {agreement:.0%})"
+        )
+
+
+if __name__ == "__main__":
+    main()
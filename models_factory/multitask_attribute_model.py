@@ -0,0 +1,205 @@
+"""
+Multi-task top wear attribute model: one shared backbone, one head per attribute.
+
+The single-task scripts (sleeve_length_prediction.py, neckline_prediction.py,
+outer_clothing_cardigan_prediction.py, upper_clothing_covering_navel_prediction.py)
+each train a full backbone, so serving runs four backbones per image. This
+trains one DenseNet121 (or MobileNetV2) backbone whose pooled embedding feeds
+a small dense head per attribute.
+
+Labels are encoded with the existing encoders in Models/attribute_models, so
+the served label strings do not change. The script reports per-head test
+accuracy next to the current single-task models, and the FLOPs per image of
+both setups.
+
+Serve it by setting [attribute_models] top_wear_multitask = true.
+
+Usage (from the project root):
+    python -m models_factory.multitask_attribute_model \
+        --csv filtered_top_wear.csv --images cropped_images/top_wear/
+"""
+
+import argparse
+import os
+import cv2
+import joblib
+import numpy as np
+import pandas as pd
+import tensorflow as tf
+import toml
+from sklearn.model_selection import train_test_split
+from tensorflow.keras import Model, layers, regularizers
+from tensorflow.keras.callbacks import EarlyStopping, ReduceLROnPlateau
+from tensorflow.keras.optimizers import Adam
+
+from src.attribute_backends import (
+    attribute_label_columns,
+    top_wear_attribute_names,
+    top_wear_encoder_files,
+    top_wear_model_files,
+    top_wear_multitask_file,
+)
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CONFIG_PATH = os.path.join(BASE_DIR, "config", "config.toml")
+config = toml.load(CONFIG_PATH)
+model_path = config["attribute_models"]["model_path"]
+
+IMG_SIZE = (128, 128)
+
+BACKBONES = {
+    "densenet": tf.keras.applications.DenseNet121,
+    "mobilenet": tf.keras.applications.MobileNetV2,
+}
+
+
+def preprocess_image(path):
+    img = cv2.imread(path)
+    if img is None:
+        return None
+    img = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
+    img = cv2.resize(img, IMG_SIZE)
+    return img / 255.0
+
+
+def load_data(csv_path, image_dir, encoders):
+    """Images plus one encoded label column per head; rows an encoder cannot map are dropped."""
+    df = pd.read_csv(csv_path)
+    df["Image_Path"] = [os.path.join(image_dir, i) for i in df["Image_ID"]]
+
+    for name, encoder in zip(top_wear_attribute_names, encoders):
+        column = attribute_label_columns[name]
+        df = df[df[column].isin(encoder.classes_)].copy()
+        df[name] = encoder.transform(df[column])
+
+    images, keep = [], []
+    for idx, path in zip(df.index, df["Image_Path"]):
+        img = preprocess_image(path)
+        if img is not None:
+            images.append(img)
+            keep.append(idx)
+    df = df.loc[keep]
+    return np.array(images, dtype=np.float32), df[top_wear_attribute_names]
+
+
+def build_multitask_model(backbone, encoders, dense_units=128, dropout=0.4, unfreeze_layers=30):
+    base_model = BACKBONES[backbone](
+        include_top=False, input_shape=(*IMG_SIZE, 3), weights="imagenet"
+    )
+    for layer in base_model.layers[:-unfreeze_layers]:
+        layer.trainable = False
+
+    embedding = layers.GlobalAveragePooling2D(name="embedding")(base_model.output)
+    embedding = layers.BatchNormalization()(embedding)
+
+    outputs = []
+    for name, encoder in zip(top_wear_attribute_names, encoders):
+        x = layers.Dense(
+            dense_units,
+            activation="relu",
+            kernel_regularizer=regularizers.l2(1e-4),
+            name=f"{name}_dense",
+        )(embedding)
+        x = layers.Dropout(dropout, name=f"{name}_dropout")(x)
+        outputs.append(
+            layers.Dense(len(encoder.classes_), activation="softmax", name=name)(x)
+        )
+
+    return Model(inputs=base_model.input, outputs=outputs)
+
+
+def count_flops(model):
+    """Float ops for one 128x128 image, from the frozen inference graph."""
+    from tensorflow.python.framework.convert_to_constants import (
+        convert_variables_to_constants_v2,
+    )
+
+    concrete = tf.function(lambda x: model(x, training=False)).get_concrete_function(
+        tf.TensorSpec([1, *IMG_SIZE, 3], tf.float32)
+    )
+    frozen = convert_variables_to_constants_v2(concrete)
+    profile = tf.compat.v1.profiler.profile(
+        graph=frozen.graph,
+        run_meta=tf.compat.v1.RunMetadata(),
+        cmd="op",
+        options=tf.compat.v1.profiler.ProfileOptionBuilder.float_operation(),
+    )
+    return profile.total_float_ops
+
+
+def compare_with_single_task(model, X_test, y_test):
+    multitask_probs = model.predict(X_test, verbose=0)
+    multitask_flops = count_flops(model)
+    single_task_flops = 0
+
+    print("\nPer-head test accuracy")
+    for i, (name, model_file) in enumerate(zip(top_wear_attribute_names, top_wear_model_files)):
+        y_true = y_test[name].values
+        multitask_acc = np.mean(np.argmax(multitask_probs[i], axis=1) == y_true)
+
+        single_path = os.path.join(model_path, model_file)
+        if os.path.exists(single_path):
+            single_model = tf.keras.models.load_model(single_path)
+            single_acc = np.mean(
+                np.argmax(single_model.predict(X_test, verbose=0), axis=1) == y_true
+            )
+            single_task_flops += count_flops(single_model)
+            single_text = f"{single_acc:.4f}"
+        else:
+            single_text = "n/a"
+        print(f"{name:>16}: multi-task {multitask_acc:.4f} | single-task {single_text}")
+
+    print(f"\nGFLOPs per image: multi-task {multitask_flops / 1e9:.2f}", end="")
+    if single_task_flops:
+        print(
+            f" | single-task total {single_task_flops / 1e9:.2f} "
+            f"({single_task_flops / multitask_flops:.1f}x)"
+        )
+    else:
+        print()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Train the shared-backbone top wear model")
+    parser.add_argument("--csv", required=True, help="top wear attribute CSV with Image_ID")
+    parser.add_argument("--images", required=True, help="directory of cropped top wear images")
+    parser.add_argument("--backbone", choices=sorted(BACKBONES), default="densenet")
+    parser.add_argument("--epochs", type=int, default=20)
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--learning-rate", type=float, default=1e-4)
+    parser.add_argument("--output", default=os.path.join(model_path, top_wear_multitask_file))
+    args = parser.parse_args()
+
+    encoders = [joblib.load(os.path.join(model_path, f)) for f in top_wear_encoder_files]
+    X, y = load_data(args.csv, args.images, encoders)
+    X_train, X_test, y_train, y_test = train_test_split(
+        X, y, test_size=0.2, stratify=y["sleeve_length"], random_state=42
+    )
+    print(f"train={len(X_train)} test={len(X_test)}")
+
+    model = build_multitask_model(args.backbone, encoders)
+    model.compile(
+        optimizer=Adam(learning_rate=args.learning_rate),
+        loss={name: "sparse_categorical_crossentropy" for name in top_wear_attribute_names},
+        metrics={name: ["sparse_categorical_accuracy"] for name in top_wear_attribute_names},
+    )
+    model.fit(
+        X_train,
+        {name: y_train[name].values for name in top_wear_attribute_names},
+        validation_data=(X_test, {name: y_test[name].values for name in top_wear_attribute_names}),
+        epochs=args.epochs,
+        batch_size=args.batch_size,
+        callbacks=[
+            EarlyStopping(patience=4, restore_best_weights=True),
+            ReduceLROnPlateau(patience=2),
+        ],
+    )
+
+    model.save(args.output)
+    print(f"Model saved as '{args.output}'")
+
+    compare_with_single_task(model, X_test, y_test)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Post-training quantization of the exported ONNX attribute models.
+
+For every <model>.onnx in [attribute_models] onnx_model_path this writes
+  <model>.int8.onnx  dynamic-range int8 weights (onnxruntime.quantization)
+  <model>.fp16.onnx  float16 weights, float32 inputs/outputs kept
+Choose the served variant with [attribute_models] onnx_precision, after
+checking it with:
+    python -m benchmarks.quantization_regression --labels ... --images ...
+
+Usage (from the project root, after export_attribute_models_onnx):
+    python -m models_factory.quantize_attribute_models [--precision int8 fp16]
+"""
+
+import argparse
+import os
+import onnx
+import toml
+from onnxconverter_common import float16
+from onnxruntime.quantization import QuantType, quantize_dynamic
+
+from src.attribute_backends import (
+    bottom_wear_model_files,
+    onnx_filename,
+    top_wear_model_files,
+)
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CONFIG_PATH = os.path.join(BASE_DIR, "config", "config.toml")
+config = toml.load(CONFIG_PATH)
+base_path = config["attribute_models"]["model_path"]
+onnx_model_path = config["attribute_models"].get(
+    "onnx_model_path", os.path.join(base_path, "onnx")
+)
+
+
+def quantize_int8(source, output):
+    quantize_dynamic(source, output, weight_type=QuantType.QInt8)
+
+
+def convert_fp16(source, output):
+    model = onnx.load(source)
+    # Callers keep feeding float32 images and reading float32 probabilities
+    model = float16.convert_float_to_float16(model, keep_io_types=True)
+    onnx.save(model, output)
+
+
+CONVERTERS = {"int8": quantize_int8, "fp16": convert_fp16}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Quantize the ONNX attribute models")
+    parser.add_argument("--models", default=onnx_model_path)
+    parser.add_argument(
+        "--precision", nargs="+", choices=sorted(CONVERTERS), default=sorted(CONVERTERS)
+    )
+    args = parser.parse_args()
+
+    for model_file in top_wear_model_files + bottom_wear_model_files:
+        source = os.path.join(args.models, onnx_filename(model_file))
+        if not os.path.exists(source):
+            print(f"Skipping {source}: export it with export_attribute_models_onnx first")
+            continue
+
+        source_mb = os.path.getsize(source) / 1e6
+        for precision in args.precision:
+            output = os.path.join(args.models, onnx_filename(model_file, precision))
+            CONVERTERS[precision](source, output)
+            output_mb = os.path.getsize(output) / 1e6
+            print(
+                f"{os.path.basename(output)}: {source_mb:.1f} MB -> {output_mb:.1f} MB "
+                f"({source_mb / output_mb:.1f}x smaller)"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+"""
+Offline retrain for the top wear weather clustering model.
+
+Fits K-Prototypes once on the reference dataset and saves the artifact
+(centroids, categorical indices, cluster to weather map) that the app loads
+at startup. Re-run whenever data/clustering_weather_data_topwear.csv changes.
+
+Usage (from the project root):
+    python -m models_factory.topwear_weather_clustering_model
+"""
+
+import argparse
+import pandas as pd
+
+from src.weather_suitability_clustering import (
+    build_topwear_cluster_model,
+    clustering_weather_data_topwear,
+    save_topwear_cluster_model,
+    topwear_cluster_model,
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild the top wear cluster model")
+    parser.add_argument("--data", default=clustering_weather_data_topwear)
+    parser.add_argument("--output", default=topwear_cluster_model)
+    parser.add_argument("--n-clusters", type=int, default=4)
+    parser.add_argument("--random-state", type=int, default=42)
+    args = parser.parse_args()
+
+    df = pd.read_csv(args.data)
+    artifact = build_topwear_cluster_model(
+        df, n_clusters=args.n_clusters, random_state=args.random_state
+    )
+    save_topwear_cluster_model(artifact, args.output)
+
+    print(f"Fitted on {artifact['n_samples']} rows")
+    print("Centroids:")
+    print(artifact["centroids"])
+    print(f"Model saved as '{args.output}'")
+
+
+if __name__ == "__main__":
+    main()
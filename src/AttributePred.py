@@ -1,12 +1,21 @@
 import numpy as np
 import cv2
-import tensorflow as tf
-import joblib
-import matplotlib.pyplot as plt
 import os
-from tensorflow.keras.models import load_model
 import toml
 from pathlib import Path
+from src.attribute_backends import (
+    bottom_wear_attribute_names,
+    bottom_wear_encoder_files,
+    bottom_wear_model_files,
+    load_attribute_models,
+    load_multitask_model,
+    top_wear_attribute_names,
+    top_wear_encoder_files,
+    top_wear_model_files,
+    top_wear_multitask_file,
+)
+from src.attribute_registry import ModelGroupRegistry
+from src.prepared_image import PreparedImage
 
 BASE_DIR = Path(__file__).resolve().parent.parent
 CONFIG_PATH = BASE_DIR / "config" / "config.toml"
@@ -15,77 +24,93 @@ config = toml.load(CONFIG_PATH)
 # Base path for top_wear_models and top_wear_encoders
 base_path = config["attribute_models"]["model_path"]
 
-# Model and encoder filenames
-top_wear_model_files = [
-    "best_sleeve_model.keras",
-    "outer_cardigan_best_model_densenet.keras",
-    "navel_covering_model_densenet.keras",
-    "neckline_best_model_densenet.keras",
-]
+# "keras" (TensorFlow) or "onnx" (ONNX Runtime, see models_factory/export_attribute_models_onnx.py)
+attribute_backend = config["attribute_models"].get("backend", "keras")
+onnx_model_path = config["attribute_models"].get(
+    "onnx_model_path", os.path.join(base_path, "onnx")
+)
+# "fp32", "fp16" or "int8" (models_factory/quantize_attribute_models.py)
+onnx_precision = config["attribute_models"].get("onnx_precision", "fp32")
+onnx_intra_op_threads = config["attribute_models"].get("onnx_intra_op_threads", 1)
+onnx_inter_op_threads = config["attribute_models"].get("onnx_inter_op_threads", 1)
+# One shared backbone for all top wear heads instead of four models (keras backend)
+top_wear_multitask = config["attribute_models"].get("top_wear_multitask", False)
+# Crop model inputs to the clothing's bounding box from the background-removal mask
+# (off until benchmarks.foreground_crop_regression passes on a held-out set)
+crop_to_foreground = config["attribute_models"].get("crop_to_foreground", False)
+crop_padding = config["attribute_models"].get("crop_padding", 0.05)
+
+backend_options = dict(
+    backend=attribute_backend,
+    onnx_path=onnx_model_path,
+    onnx_precision=onnx_precision,
+    intra_op_threads=onnx_intra_op_threads,
+    inter_op_threads=onnx_inter_op_threads,
+    max_workers=config["attribute_models"].get("load_workers", 4),
+)
+
+
+
+def load_top_wear_models():
+    if top_wear_multitask:
+        if attribute_backend == "keras":
+            loaded = load_multitask_model(
+                top_wear_multitask_file, top_wear_encoder_files, base_path
+            )
+            if loaded is not None:
+                return loaded
+        else:
+            print("Warning: top_wear_multitask is only supported by the keras backend")
+    return load_attribute_models(
+        top_wear_model_files, top_wear_encoder_files, base_path, **backend_options
+    )
+
+
+def load_bottom_wear_models():
+    return load_attribute_models(
+        bottom_wear_model_files, bottom_wear_encoder_files, base_path, **backend_options
+    )
+
+
+# Concurrent requests are micro-batched into one forward pass per predictor
+batching_config = config.get("attribute_batching", {})
+batching_options = None
+if batching_config.get("enabled", True):
+    batching_options = dict(
+        max_batch_size=batching_config.get("max_batch_size", 8),
+        max_wait_ms=batching_config.get("max_wait_ms", 5),
+    )
+
+# Models load in background threads: at import ("eager") or on first use ("lazy")
+attribute_models = ModelGroupRegistry(
+    {"top": load_top_wear_models, "bottom": load_bottom_wear_models},
+    mode=config["attribute_models"].get("load_mode", "eager"),
+    warmup=config["attribute_models"].get("warmup", True),
+    batching_options=batching_options,
+    retry_seconds=config["attribute_models"].get("retry_seconds", 60),
+)
+if attribute_models.mode == "eager":
+    attribute_models.start()
 
-top_wear_encoder_files = [
-    "sleeve_length_encoder.pkl",
-    "outer_cardigan_encoder.pkl",
-    "navel_encoder.pkl",
-    "neckline_encoder.pkl",
-]
-
-# Model and encoder filenames
-bottom_wear_model_files = ["best_bottomwear_model.keras"]
+IMG_SIZE = (128, 128)
 
-bottom_wear_encoder_files = ["bottom_length_encoder.pkl"]
 
+def get_attribute_batching_stats():
+    """Queue depth / batch size metrics per batcher (empty when batching is off)."""
+    return [b.stats() for b in attribute_models.batchers()]
 
-# Attribute names corresponding to each model
-top_wear_attribute_names = [
-    "sleeve_length",
-    "outer_cardigan",
-    "navel_covering",
-    "neckline",
-]
 
-bottom_wear_attribute_names = ["lower_clothing_length"]
+def get_attribute_models_status():
+    """Load state and readiness of the attribute models."""
+    return attribute_models.status()
 
 
-# Load top_wear_models and top_wear_encoders
-top_wear_models = []
-top_wear_encoders = []
-bottom_wear_models = []
-bottom_wear_encoders = []
-
-# Top Wear models loading
-for model_file, encoder_file in zip(top_wear_model_files, top_wear_encoder_files):
-    model_path = os.path.join(base_path, model_file)
-    encoder_path = os.path.join(base_path, encoder_file)
-
-    try:
-        model = load_model(model_path)
-        encoder = joblib.load(encoder_path)
-        top_wear_models.append(model)
-        top_wear_encoders.append(encoder)
-        print(f"Successfully loaded {model_file} and {encoder_file}")
-    except Exception as e:
-        print(f"Error loading {model_file} or {encoder_file}: {str(e)}")
-        top_wear_models.append(None)
-        top_wear_encoders.append(None)
-
-# bottom Wear models loading
-for model_file, encoder_file in zip(bottom_wear_model_files, bottom_wear_encoder_files):
-    model_path = os.path.join(base_path, model_file)
-    encoder_path = os.path.join(base_path, encoder_file)
-
-    try:
-        model = load_model(model_path)
-        encoder = joblib.load(encoder_path)
-        bottom_wear_models.append(model)
-        bottom_wear_encoders.append(encoder)
-        print(f"Successfully loaded {model_file} and {encoder_file}")
-    except Exception as e:
-        print(f"Error loading {model_file} or {encoder_file}: {str(e)}")
-        bottom_wear_models.append(None)
-        bottom_wear_encoders.append(None)
-
-IMG_SIZE = (128, 128)
+def get_model_group(name, size):
+    """(models, encoders, group) for a clothing type, waiting for the load if needed."""
+    group = attribute_models.get(name)
+    if group is None:
+        return [None] * size, [None] * size, None
+    return group.models, group.encoders, group
 
 
 # Preprocess Function
@@ -100,17 +125,41 @@ def preprocess_image(path):
     return img
 
 
+def cropped_attribute_input(image):
+    """
+    128x128 model input cropped to the clothing. The mask comes from the same
+    rembg pass as the colors; the full frame is used if no clothing was found.
+    """
+    from src.get_color import foreground_box
+
+    try:
+        return image.attribute_input(foreground_box(image, crop_padding))
+    except Exception as e:
+        print(f"Warning: foreground crop failed, using the full image - {e}")
+    return image.attribute_input()
+
+
+def foreground_attribute_input(image):
+    """Model input for `image`: cropped if crop_to_foreground is on, else the full frame."""
+    if crop_to_foreground:
+        return cropped_attribute_input(image)
+    return image.attribute_input()
+
+
 # Function to get image predictions for all attributes and return as dictionary
-def get_all_attribute_predictions(image_path, clothing_type):
-    # Get image name from path
-    image_name = os.path.basename(image_path)
+# `image` is a PreparedImage (shared with the hash/color stages) or an image path
+def get_all_attribute_predictions(image, clothing_type):
+    if isinstance(image, PreparedImage):
+        image_name = os.path.basename(image.name)
+        processed_img = foreground_attribute_input(image)
+    else:
+        # Get image name from path
+        image_name = os.path.basename(image)
+        processed_img = preprocess_image(image)
 
     # Initialize result dictionary with image ID
     result = {"imageid": image_name}
 
-    # Preprocess image
-    processed_img = preprocess_image(image_path)
-
     if processed_img is None:
         # If image not found, set all attributes to "Image not found"
         for attr_name in top_wear_attribute_names:
@@ -121,6 +170,17 @@ def get_all_attribute_predictions(image_path, clothing_type):
     img_batch = np.expand_dims(processed_img, axis=0)
 
     if clothing_type.lower() == "top":
+        top_wear_models, top_wear_encoders, top_wear = get_model_group(
+            "top", len(top_wear_attribute_names)
+        )
+        # All top wear heads in one backend call; per-model predict if that fails
+        fused_probs = [None] * len(top_wear_models)
+        if top_wear is not None:
+            try:
+                fused_probs = top_wear.predict(processed_img)
+            except Exception as e:
+                print(f"Warning: batched top wear prediction failed - {e}")
+
         # Make predictions for each top wear model/attribute
         for i, (model, encoder, attr_name) in enumerate(
             zip(top_wear_models, top_wear_encoders, top_wear_attribute_names)
@@ -131,9 +191,11 @@ def get_all_attribute_predictions(image_path, clothing_type):
 
             try:
                 # Make prediction
-                pred_probs = model.predict(
-                    img_batch, verbose=0
-                )  # Set verbose=0 to suppress progress bar
+                pred_probs = fused_probs[i]
+                if pred_probs is None:
+                    pred_probs = model.predict(
+                        img_batch, verbose=0
+                    )  # Set verbose=0 to suppress progress bar
                 pred_class_idx = np.argmax(pred_probs, axis=1)[0]
                 pred_label = encoder.inverse_transform([pred_class_idx])[0]
 
@@ -144,6 +206,16 @@ def get_all_attribute_predictions(image_path, clothing_type):
                 result[attr_name] = f"Error in prediction: {str(e)}"
 
     elif clothing_type.lower() == "bottom":
+        bottom_wear_models, bottom_wear_encoders, bottom_wear = get_model_group(
+            "bottom", len(bottom_wear_attribute_names)
+        )
+        fused_probs = [None] * len(bottom_wear_models)
+        if bottom_wear is not None:
+            try:
+                fused_probs = bottom_wear.predict(processed_img)
+            except Exception as e:
+                print(f"Warning: batched bottom wear prediction failed - {e}")
+
         # Make predictions for each bottom wear model/attribute
         for i, (model, encoder, attr_name) in enumerate(
             zip(bottom_wear_models, bottom_wear_encoders, bottom_wear_attribute_names)
@@ -153,9 +225,11 @@ def get_all_attribute_predictions(image_path, clothing_type):
                 continue
             try:
                 # Make prediction
-                pred_probs = model.predict(
-                    img_batch, verbose=0
-                )  # Set verbose=0 to suppress progress bar
+                pred_probs = fused_probs[i]
+                if pred_probs is None:
+                    pred_probs = model.predict(
+                        img_batch, verbose=0
+                    )  # Set verbose=0 to suppress progress bar
                 pred_class_idx = np.argmax(pred_probs, axis=1)[0]
                 pred_label = encoder.inverse_transform([pred_class_idx])[0]
 
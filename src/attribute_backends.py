@@ -0,0 +1,256 @@
+"""
+Inference backends for the clothing attribute models.
+
+"keras" loads the .keras files with TensorFlow and runs them through one
+fused tf.function. "onnx" runs the exported .onnx files on ONNX Runtime CPU
+sessions and never imports TensorFlow.
+"""
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+import joblib
+import numpy as np
+from src.prepared_image import ATTRIBUTE_INPUT_SIZE
+
+BACKENDS = ("keras", "onnx")
+# ONNX variants written by models_factory/quantize_attribute_models.py
+ONNX_PRECISIONS = ("fp32", "fp16", "int8")
+
+# Model and encoder filenames
+top_wear_model_files = [
+    "best_sleeve_model.keras",
+    "outer_cardigan_best_model_densenet.keras",
+    "navel_covering_model_densenet.keras",
+    "neckline_best_model_densenet.keras",
+]
+
+top_wear_encoder_files = [
+    "sleeve_length_encoder.pkl",
+    "outer_cardigan_encoder.pkl",
+    "navel_encoder.pkl",
+    "neckline_encoder.pkl",
+]
+
+# Model and encoder filenames
+bottom_wear_model_files = ["best_bottomwear_model.keras"]
+
+bottom_wear_encoder_files = ["bottom_length_encoder.pkl"]
+
+
+# Attribute names corresponding to each model
+top_wear_attribute_names = [
+    "sleeve_length",
+    "outer_cardigan",
+    "navel_covering",
+    "neckline",
+]
+
+bottom_wear_attribute_names = ["lower_clothing_length"]
+
+# Shared-backbone model with one output per top wear attribute
+# (models_factory/multitask_attribute_model.py)
+top_wear_multitask_file = "multitask_topwear_model.keras"
+
+# Dataset / wardrobe CSV column holding each served attribute's label
+attribute_label_columns = {
+    "sleeve_length": "sleeve_length",
+    "outer_cardigan": "outer_clothing_cardigan",
+    "navel_covering": "upper_clothing_covering_navel",
+    "neckline": "neckline",
+    "lower_clothing_length": "lower_clothing_length",
+}
+
+
+def onnx_filename(model_file, precision="fp32"):
+    """best_sleeve_model.keras -> best_sleeve_model.onnx (or .int8.onnx, .fp16.onnx)"""
+    if precision not in ONNX_PRECISIONS:
+        raise ValueError(f"Unknown ONNX precision: {precision}")
+    suffix = "" if precision == "fp32" else f".{precision}"
+    return Path(model_file).stem + suffix + ".onnx"
+
+
+class FusedPredictor:
+    """
+    Runs several single-output Keras models as one multi-output tf.function.
+
+    One graph call per image replaces a model.predict() per attribute, each
+    of which builds its own data adapter and step function. The fixed input
+    signature means the graph is traced once, on the first call, for any
+    batch size. Missing models (None) get None in the output list.
+    """
+
+    def __init__(self, models):
+        import tensorflow as tf
+
+        self._tf = tf
+        self.size = len(models)
+        self.indices = [i for i, model in enumerate(models) if model is not None]
+        members = [models[i] for i in self.indices]
+        self._fn = None
+        if members:
+            self._fn = tf.function(
+                lambda images: [model(images, training=False) for model in members],
+                input_signature=[
+                    tf.TensorSpec([None, *ATTRIBUTE_INPUT_SIZE, 3], tf.float32)
+                ],
+            )
+
+    def predict(self, img_batch):
+        outputs = [None] * self.size
+        if self._fn is None:
+            return outputs
+        probs = self._fn(self._tf.convert_to_tensor(img_batch, dtype=self._tf.float32))
+        for i, p in zip(self.indices, probs):
+            outputs[i] = p.numpy()
+        return outputs
+
+
+class HeadView:
+    """One head of a multi-task model, behind the single-task predict() interface."""
+
+    def __init__(self, model, index):
+        self.model = model
+        self.index = index
+
+    def predict(self, img_batch, verbose=0):
+        return self.model.predict(img_batch, verbose=verbose)[self.index]
+
+
+class MultiTaskPredictor:
+    """
+    FusedPredictor counterpart for one multi-output Keras model: the backbone
+    runs once per batch and every head reads the shared embedding.
+    """
+
+    def __init__(self, model, size):
+        import tensorflow as tf
+
+        self._tf = tf
+        self.size = size
+        self._fn = tf.function(
+            lambda images: model(images, training=False),
+            input_signature=[tf.TensorSpec([None, *ATTRIBUTE_INPUT_SIZE, 3], tf.float32)],
+        )
+
+    def predict(self, img_batch):
+        probs = self._fn(self._tf.convert_to_tensor(img_batch, dtype=self._tf.float32))
+        return [p.numpy() for p in probs]
+
+
+class OnnxAttributeModel:
+    """One exported attribute model on an ONNX Runtime CPU session."""
+
+    def __init__(self, path, intra_op_threads=1, inter_op_threads=1):
+        import onnxruntime as ort
+
+        options = ort.SessionOptions()
+        options.intra_op_num_threads = intra_op_threads
+        options.inter_op_num_threads = inter_op_threads
+        options.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self.session = ort.InferenceSession(
+            str(path), sess_options=options, providers=["CPUExecutionProvider"]
+        )
+        self.input_name = self.session.get_inputs()[0].name
+
+    def predict(self, img_batch, verbose=0):
+        # Same call shape as keras Model.predict so callers can use either
+        feed = {self.input_name: np.asarray(img_batch, dtype=np.float32)}
+        return self.session.run(None, feed)[0]
+
+
+class OnnxPredictor:
+    """FusedPredictor counterpart for ONNX sessions: one run per head."""
+
+    def __init__(self, models):
+        self.models = models
+        self.size = len(models)
+
+    def predict(self, img_batch):
+        img_batch = np.asarray(img_batch, dtype=np.float32)
+        return [
+            None if model is None else model.predict(img_batch)
+            for model in self.models
+        ]
+
+
+def load_attribute_models(
+    model_files,
+    encoder_files,
+    base_path,
+    backend="keras",
+    onnx_path=None,
+    onnx_precision="fp32",
+    intra_op_threads=1,
+    inter_op_threads=1,
+    max_workers=4,
+):
+    """
+    Load models and label encoders side by side, up to max_workers files at once.
+
+    Returns:
+        (models, encoders, predictor); a model/encoder pair that fails to
+        load is None in both lists
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown attribute model backend: {backend}")
+
+    if backend == "keras":
+        from tensorflow.keras.models import load_model
+
+    def load_pair(model_file, encoder_file):
+        encoder_path = os.path.join(base_path, encoder_file)
+        try:
+            if backend == "onnx":
+                model_file = onnx_filename(model_file, onnx_precision)
+                model = OnnxAttributeModel(
+                    os.path.join(onnx_path or base_path, model_file),
+                    intra_op_threads=intra_op_threads,
+                    inter_op_threads=inter_op_threads,
+                )
+            else:
+                model = load_model(os.path.join(base_path, model_file))
+            encoder = joblib.load(encoder_path)
+            print(f"Successfully loaded {model_file} and {encoder_file}")
+            return model, encoder
+        except Exception as e:
+            print(f"Error loading {model_file} or {encoder_file}: {str(e)}")
+            return None, None
+
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as pool:
+        pairs = list(pool.map(load_pair, model_files, encoder_files))
+
+    models = [model for model, _ in pairs]
+    encoders = [encoder for _, encoder in pairs]
+    predictor = OnnxPredictor(models) if backend == "onnx" else FusedPredictor(models)
+    return models, encoders, predictor
+
+
+def load_multitask_model(model_file, encoder_files, base_path):
+    """
+    Load the shared-backbone model with the existing label encoders.
+
+    Returns:
+        (head views, encoders, predictor) in the same shape as
+        load_attribute_models, or None if the model cannot be loaded
+    """
+    from tensorflow.keras.models import load_model
+
+    try:
+        model = load_model(os.path.join(base_path, model_file))
+        encoders = [joblib.load(os.path.join(base_path, f)) for f in encoder_files]
+    except Exception as e:
+        print(f"Error loading {model_file}: {str(e)}")
+        return None
+
+    if len(model.outputs) != len(encoders):
+        print(
+            f"Error loading {model_file}: {len(model.outputs)} outputs "
+            f"for {len(encoders)} encoders"
+        )
+        return None
+
+    print(f"Successfully loaded {model_file} ({len(encoders)} heads)")
+    heads = [HeadView(model, i) for i in range(len(encoders))]
+    return heads, encoders, MultiTaskPredictor(model, len(encoders))
@@ -0,0 +1,176 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from src.micro_batcher import MicroBatcher
+from src.prepared_image import ATTRIBUTE_INPUT_SIZE
+
+LOAD_MODES = ("eager", "lazy")
+
+
+class ModelGroup:
+    """Models, encoders and predictor for one clothing type, plus its batcher."""
+
+    def __init__(self, name, models, encoders, predictor, batcher=None):
+        self.name = name
+        self.models = models
+        self.encoders = encoders
+        self.predictor = predictor
+        self.batcher = batcher
+
+    def predict(self, processed_img):
+        """Per-head probabilities (1, classes) for one image, batched when enabled."""
+        if self.batcher is not None:
+            return self.batcher.predict(processed_img)
+        return self.predictor.predict(np.expand_dims(processed_img, axis=0))
+
+
+class ModelGroupRegistry:
+    """
+    Loads named model groups in parallel threads, off the import path.
+
+    - "eager": start() is called at boot and loading runs in the background,
+      so importing the app stays fast.
+    - "lazy": nothing loads until the first get().
+
+    Each group gets a warm-up forward pass on a dummy batch (tracing the
+    tf.function / initialising the ONNX sessions) before the registry reports
+    ready, so the first real request does not pay for it.
+
+    Groups that fail to load are retried, alone, on the first get() or
+    status() call at least retry_seconds after the failure (0 disables
+    retries); groups that loaded keep serving in the meantime.
+    """
+
+    def __init__(
+        self, loaders, mode="eager", warmup=True, batching_options=None, retry_seconds=60
+    ):
+        if mode not in LOAD_MODES:
+            raise ValueError(f"Unknown model load mode: {mode}")
+        self.loaders = loaders
+        self.mode = mode
+        self.warmup = warmup
+        self.batching_options = batching_options
+        self.retry_seconds = retry_seconds
+        self.groups = {}
+        self.state = "idle"
+        self.load_seconds = None
+        self.load_attempts = 0
+        self.failed_at = None
+        self.errors = {}
+        self._loaded = threading.Event()
+        self._lock = threading.Lock()
+
+    def start(self):
+        """
+        Begin loading in a background thread. No-op once started, except that
+        failed groups are reloaded once retry_seconds have passed.
+        """
+        with self._lock:
+            if self.state == "idle":
+                names = list(self.loaders)
+            elif self.state == "failed" and self._retry_due():
+                names = list(self.errors)
+                print(f"Retrying failed attribute models: {', '.join(names)}")
+            else:
+                return
+            self.state = "loading"
+            self._loaded.clear()
+        threading.Thread(
+            target=self._load_all, args=(names,), name="model-loader", daemon=True
+        ).start()
+
+    def _retry_due(self):
+        return (
+            self.retry_seconds > 0
+            and time.monotonic() - self.failed_at >= self.retry_seconds
+        )
+
+    def _load_group(self, name, loader):
+        models, encoders, predictor = loader()
+        if self.warmup:
+            started = time.perf_counter()
+            try:
+                predictor.predict(np.zeros((1, *ATTRIBUTE_INPUT_SIZE, 3), dtype=np.float32))
+                print(f"Warmed up {name} models in {time.perf_counter() - started:.2f}s")
+            except Exception as e:
+                print(f"Warning: warm-up failed for {name} models - {e}")
+
+        batcher = None
+        if self.batching_options is not None:
+            batcher = MicroBatcher(predictor.predict, name=name, **self.batching_options)
+        return ModelGroup(name, models, encoders, predictor, batcher)
+
+    def _load_all(self, names):
+        started = time.perf_counter()
+        errors = {}
+        with ThreadPoolExecutor(max_workers=len(names)) as pool:
+            futures = {
+                name: pool.submit(self._load_group, name, self.loaders[name])
+                for name in names
+            }
+            for name, future in futures.items():
+                try:
+                    self.groups[name] = future.result()
+                except Exception as e:
+                    print(f"Error loading {name} models: {str(e)}")
+                    errors[name] = str(e)
+
+        self.load_seconds = time.perf_counter() - started
+        self.load_attempts += 1
+        self.errors = errors
+        self.failed_at = time.monotonic() if errors else None
+        self.state = "failed" if errors else "ready"
+        print(f"Attribute models {self.state} after {self.load_seconds:.2f}s")
+        self._loaded.set()
+
+    def wait(self, timeout=None):
+        """Start loading if needed and block until it has finished; returns the state."""
+        self.start()
+        self._loaded.wait(timeout)
+        return self.state
+
+    def get(self, name, timeout=None):
+        """The loaded group, waiting for (or triggering) the load; None if it failed."""
+        group = self.groups.get(name)
+        if group is None:
+            # Loaded groups never wait on a retry of another group
+            self.start()
+            self._loaded.wait(timeout)
+            group = self.groups.get(name)
+        return group
+
+    @property
+    def ready(self):
+        # A lazy worker that has not started loading can still take traffic;
+        # its first request triggers the load
+        return self.state == "ready" or (self.mode == "lazy" and self.state == "idle")
+
+    def status(self):
+        # Readiness probes keep polling a failed worker, so they drive its retries
+        if self.state == "failed":
+            self.start()
+        errors = self.errors
+        groups = {
+            name: {
+                "state": "loaded",
+                "models_loaded": sum(m is not None for m in group.models),
+                "models_total": len(group.models),
+            }
+            for name, group in self.groups.items()
+        }
+        for name, error in errors.items():
+            groups[name] = {"state": "failed", "error": error}
+        return {
+            "state": self.state,
+            "mode": self.mode,
+            "ready": self.ready,
+            "load_seconds": self.load_seconds,
+            "load_attempts": self.load_attempts,
+            "retry_seconds": self.retry_seconds,
+            "errors": errors,
+            "groups": groups,
+        }
+
+    def batchers(self):
+        return [g.batcher for g in self.groups.values() if g.batcher is not None]
@@ -0,0 +1,44 @@
+"""
+Attribute and color inference for one upload, sharing a single foreground pass.
+
+Both stages read the same cached rembg mask on the PreparedImage: colors take
+the masked pixels, the attribute models take the mask's bounding-box crop.
+The color stage runs on a small thread pool while the attribute stage runs on
+the calling thread; whichever reaches the mask first computes it and the other
+waits for it instead of running rembg again.
+"""
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+import toml
+from src import AttributePred, get_color
+from src.prepared_image import PreparedImage
+
+# Find base directory (WearPerfect folder)
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Path to config file
+CONFIG_PATH = os.path.join(BASE_DIR, "config", "config.toml")
+
+# Load config
+config = toml.load(CONFIG_PATH)
+analysis_config = config.get("analysis", {})
+PARALLEL = analysis_config.get("parallel", True)
+WORKERS = analysis_config.get("workers", 4)
+
+_executor = (
+    ThreadPoolExecutor(max_workers=WORKERS, thread_name_prefix="color-stage")
+    if PARALLEL
+    else None
+)
+
+
+def analyze_image(image, clothing_type):
+    """(attribute dict, color dict) for a PreparedImage or an image path."""
+    image = PreparedImage.coerce(image)
+    if _executor is None:
+        attributes = AttributePred.get_all_attribute_predictions(image, clothing_type)
+        return attributes, get_color.get_image_colors(image)
+
+    colors = _executor.submit(get_color.get_image_colors, image)
+    attributes = AttributePred.get_all_attribute_predictions(image, clothing_type)
+    return attributes, colors.result()
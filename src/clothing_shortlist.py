@@ -1,9 +1,9 @@
-import csv
 import json
 import ast
 import random
 import os
 import toml
+from src import wardrobe_store
 
 config_path = os.path.join("config", "config.toml")
 config = toml.load(config_path)
@@ -20,15 +20,10 @@ def get_next_wardrobe_batch(user_id, weather, clothing_type, max_items=5):
     global user_batch_state
     weather = weather.strip().lower()
     key = (user_id, clothing_type, weather)
-    csv_file = (
-        config["paths"]["top_wear_csv"]
-        if clothing_type.lower() == "top"
-        else config["paths"]["bottom_wear_csv"]
-    )
 
     # Initialize if first time or no state
     if key not in user_batch_state:
-        eligible_items = load_and_filter_clothing(csv_file, weather, user_id)
+        eligible_items = load_and_filter_clothing(clothing_type, weather, user_id)
         random.shuffle(eligible_items)
         user_batch_state[key] = {"items": eligible_items, "index": 0}
 
@@ -52,28 +47,22 @@ def get_next_wardrobe_batch(user_id, weather, clothing_type, max_items=5):
     return batch
 
 
-def load_and_filter_clothing(csv_file, weather_prediction, user_id):
+def load_and_filter_clothing(clothing_type, weather_prediction, user_id):
     """
-    Loads and filters clothing items from CSV by weather suitability.
+    Loads a user's clothing items of one type and filters them by weather suitability.
     """
     matching_items = []
     weather_prediction = weather_prediction.strip().lower()
+    clothing_type = "top" if clothing_type.lower() == "top" else "bottom"
 
     try:
-        with open(csv_file, mode="r", encoding="utf-8") as file:
-            reader = csv.DictReader(file)
-            for row in reader:
-                # Check if row belongs to this user
-                row_user_id = row.get("user_id", "").strip()
-                if str(row_user_id) != str(user_id):
-                    continue  # skip other users' items
-
-                # Check if weather matches
-                if is_suitable_for_weather(row.get("weather_tags", ""), weather_prediction):
-                    matching_items.append(row)
-                
+        for row in wardrobe_store.get_user_items(user_id, clothing_type):
+            # Check if weather matches
+            if is_suitable_for_weather(row.get("weather_tags", ""), weather_prediction):
+                matching_items.append(row)
+
     except Exception as e:
-        print(f"Error loading {csv_file}: {e}")
+        print(f"Error loading {clothing_type} wear items: {e}")
 
     return matching_items
 
@@ -0,0 +1,85 @@
+"""
+Nearest named color lookup in CIELAB.
+
+The palette is converted to CIELAB (D65) once and stored in a cKDTree, so a
+lookup is a tree query in a space where distance tracks perceived difference,
+instead of a Python min() over every palette entry in RGB. Queries are
+batched and memoized by integer RGB.
+"""
+
+import threading
+import numpy as np
+from scipy.spatial import cKDTree
+
+# sRGB (D65) -> XYZ
+_RGB_TO_XYZ = np.array(
+    [
+        [0.4124564, 0.3575761, 0.1804375],
+        [0.2126729, 0.7151522, 0.0721750],
+        [0.0193339, 0.1191920, 0.9503041],
+    ]
+)
+_D65_WHITE = np.array([0.95047, 1.0, 1.08883])
+
+
+def rgb_to_lab(rgb):
+    """(..., 3) RGB in 0-255 -> (..., 3) CIELAB."""
+    srgb = np.asarray(rgb, dtype=np.float64) / 255.0
+    linear = np.where(srgb <= 0.04045, srgb / 12.92, ((srgb + 0.055) / 1.055) ** 2.4)
+    xyz = linear @ _RGB_TO_XYZ.T / _D65_WHITE
+    f = np.where(xyz > (6 / 29) ** 3, np.cbrt(xyz), xyz / (3 * (6 / 29) ** 2) + 4 / 29)
+    return np.stack(
+        [
+            116 * f[..., 1] - 16,
+            500 * (f[..., 0] - f[..., 1]),
+            200 * (f[..., 1] - f[..., 2]),
+        ],
+        axis=-1,
+    )
+
+
+class ColorNameIndex:
+    """
+    Nearest palette name for RGB colors.
+
+    space="lab" measures perceptual (CIE76) distance; space="rgb" reproduces
+    the plain RGB Euclidean match. Results are cached per integer RGB, up to
+    `memo_size` entries.
+    """
+
+    def __init__(self, palette, space="lab", memo_size=65536):
+        if space not in ("lab", "rgb"):
+            raise ValueError(f"Unknown color space: {space}")
+        self.names = list(palette)
+        self.space = space
+        values = np.array([palette[name] for name in self.names], dtype=np.float64)
+        self.tree = cKDTree(rgb_to_lab(values) if space == "lab" else values)
+        self.memo_size = memo_size
+        self._memo = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _keys(rgbs):
+        quantized = np.clip(np.rint(rgbs), 0, 255).astype(np.int64)
+        return quantized, (quantized[:, 0] << 16) | (quantized[:, 1] << 8) | quantized[:, 2]
+
+    def names_for(self, rgbs):
+        """Names for an (N, 3) batch of RGB colors, one tree query for the misses."""
+        rgbs = np.asarray(rgbs, dtype=np.float64).reshape(-1, 3)
+        quantized, keys = self._keys(rgbs)
+        results = [self._memo.get(k) for k in keys.tolist()]
+
+        missing = [i for i, name in enumerate(results) if name is None]
+        if missing:
+            points = quantized[missing].astype(np.float64)
+            _, idx = self.tree.query(rgb_to_lab(points) if self.space == "lab" else points)
+            with self._lock:
+                if len(self._memo) + len(missing) > self.memo_size:
+                    self._memo.clear()
+                for i, j in zip(missing, np.atleast_1d(idx)):
+                    results[i] = self.names[j]
+                    self._memo[int(keys[i])] = results[i]
+        return results
+
+    def name_for(self, rgb):
+        return self.names_for([rgb])[0]
@@ -0,0 +1,67 @@
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+_local = threading.local()
+# Reentrant: on_create may open connections, which calls ensure_schema again
+_init_lock = threading.RLock()
+_initializing = set()
+_initialized = set()
+
+
+def get_connection(db_path):
+    """One SQLite connection per thread and database file, in WAL mode."""
+    connections = getattr(_local, "connections", None)
+    if connections is None:
+        connections = _local.connections = {}
+
+    conn = connections.get(db_path)
+    if conn is None:
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        conn = sqlite3.connect(db_path, timeout=10)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        connections[db_path] = conn
+    return conn
+
+
+def ensure_schema(db_path, name, schema, on_create=None):
+    """
+    Run `schema` once per process for (db_path, name).
+    `on_create(db_path)` runs right after, e.g. to import legacy data; other
+    threads wait until it has finished. It runs in every process, so it must
+    guard one-shot work itself (see immediate_transaction).
+    """
+    key = (db_path, name)
+    if key in _initialized:
+        return
+    with _init_lock:
+        # Already done, or being done by this thread further up the stack
+        if key in _initialized or key in _initializing:
+            return
+        _initializing.add(key)
+        try:
+            get_connection(db_path).executescript(schema)
+            if on_create is not None:
+                on_create(db_path)
+            _initialized.add(key)
+        finally:
+            _initializing.discard(key)
+
+
+@contextmanager
+def immediate_transaction(conn):
+    """
+    One transaction that takes the database write lock up front. Other
+    processes wait (up to the connection timeout) until it commits, so a
+    check-then-write inside it cannot race.
+    """
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        yield conn
+    except BaseException:
+        conn.rollback()
+        raise
+    conn.commit()
@@ -0,0 +1,80 @@
+"""
+Fast dominant colors for a set of foreground pixels.
+
+Pixels are first collapsed into a coarse RGB histogram (2^bits levels per
+channel, 32^3 bins by default). Each occupied bin is represented by the mean
+color of its pixels and weighted by its pixel count, and sklearn KMeans runs on
+those few hundred weighted points instead of up to 65k pixels. A couple of
+Lloyd steps on the raw pixels then move the centers onto the solution KMeans
+finds on the full pixel set, and clusters are ranked by raw pixel count, as the
+per-pixel engine did.
+"""
+
+import numpy as np
+from sklearn.cluster import KMeans
+
+
+def quantize_pixels(pixels, bits=5):
+    """
+    Collapse (N, 3) uint8 pixels into histogram bins.
+
+    Returns:
+        (bin colors as (M, 3) float means, (M,) pixel counts) for occupied bins
+    """
+    pixels = np.asarray(pixels).reshape(-1, 3).astype(np.int64)
+    shift = 8 - bits
+    codes = (
+        ((pixels[:, 0] >> shift) << (2 * bits))
+        | ((pixels[:, 1] >> shift) << bits)
+        | (pixels[:, 2] >> shift)
+    )
+    n_bins = 1 << (3 * bits)
+    counts = np.bincount(codes, minlength=n_bins)
+    sums = np.stack(
+        [np.bincount(codes, weights=pixels[:, c], minlength=n_bins) for c in range(3)],
+        axis=1,
+    )
+    occupied = counts > 0
+    return sums[occupied] / counts[occupied, None], counts[occupied].astype(np.float64)
+
+
+def refine_centers(pixels, centers, iterations=2):
+    """
+    Lloyd iterations on the raw pixels starting from `centers`.
+
+    Returns:
+        (centers (K, 3), pixel count per center (K,))
+    """
+    pixels = np.asarray(pixels).reshape(-1, 3).astype(np.float32)
+    centers = np.array(centers, dtype=np.float64)
+    for step in range(iterations + 1):
+        # argmin |p - c|^2 == argmin |c|^2 - 2 p.c (|p|^2 is the same for every c)
+        current = centers.astype(np.float32)
+        labels = ((current**2).sum(axis=1) - 2 * pixels @ current.T).argmin(axis=1)
+        counts = np.bincount(labels, minlength=len(centers))
+        if step == iterations:
+            break
+        for c in range(3):
+            sums = np.bincount(labels, weights=pixels[:, c], minlength=len(centers))
+            np.divide(sums, counts, out=centers[:, c], where=counts > 0)
+    return centers, counts
+
+
+def dominant_colors(
+    pixels, n_clusters=5, top=2, bits=5, n_init=3, refine_iterations=2, random_state=42
+):
+    """The `top` largest k-means colors of the pixels, as int RGB tuples."""
+    if len(pixels) == 0:
+        raise ValueError("No clothing pixels found")
+    points, weights = quantize_pixels(pixels, bits)
+    kmeans = KMeans(
+        n_clusters=min(n_clusters, len(points)), n_init=n_init, random_state=random_state
+    )
+    kmeans.fit(points, sample_weight=weights)
+    centers, counts = refine_centers(pixels, kmeans.cluster_centers_, refine_iterations)
+    order = np.argsort(counts)[::-1][:top]
+    colors = [tuple(int(v) for v in centers[i]) for i in order]
+    # Single-color garments: report the same color twice, as KMeans would
+    while len(colors) < top:
+        colors.append(colors[0])
+    return colors
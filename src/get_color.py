@@ -6,6 +6,27 @@ from sklearn.cluster import KMeans
 from rembg import remove
 from matplotlib import colors as mcolors
 import cv2
+import toml
+from src.color_names import ColorNameIndex
+from src.dominant_colors import dominant_colors
+from src.prepared_image import PreparedImage, mask_box
+from src.rembg_sessions import rembg_sessions
+
+# Find base directory (WearPerfect folder)
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Path to config file
+CONFIG_PATH = os.path.join(BASE_DIR, "config", "config.toml")
+
+# Load config
+config = toml.load(CONFIG_PATH)
+colors_config = config.get("colors", {})
+# "histogram" (binned weighted k-means) or "kmeans" (sklearn on every pixel)
+COLOR_ENGINE = colors_config.get("engine", "histogram")
+HISTOGRAM_BITS = colors_config.get("histogram_bits", 5)
+HISTOGRAM_N_INIT = colors_config.get("histogram_n_init", 3)
+REFINE_ITERATIONS = colors_config.get("refine_iterations", 2)
+# Distance used to name colors: "lab" (perceptual) or "rgb" (original)
+NAME_SPACE = colors_config.get("name_space", "lab")
 
 # Load XKCD colors once
 xkcd_colors = {
@@ -14,31 +35,70 @@ xkcd_colors = {
 }
 
 
+# Nearest-name index over the XKCD palette, built once
+xkcd_index = ColorNameIndex(xkcd_colors, space=NAME_SPACE)
+
+
 def closest_xkcd_color_name(rgb):
-    rgb = np.array(rgb)
-    closest = min(xkcd_colors.items(), key=lambda item: np.linalg.norm(rgb - item[1]))
-    return closest[0]
-
-
-def extract_clothing_pixels(image_path, alpha_thresh=100, min_area=1000):
-    image = Image.open(image_path).convert("RGBA")
-    image = image.resize((256, 256))  # Resize for speed
-    image_no_bg = remove(image)
-    image_np = np.array(image_no_bg)
-    alpha_channel = image_np[:, :, 3]
-    mask = (alpha_channel > alpha_thresh).astype(np.uint8) * 255
-
-    contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
-    cleaned_mask = np.zeros_like(mask)
-    for contour in contours:
-        if cv2.contourArea(contour) >= min_area:
-            cv2.drawContours(cleaned_mask, [contour], -1, 255, thickness=cv2.FILLED)
-
-    clothing_pixels = image_np[:, :, :3][cleaned_mask > 0]
+    return xkcd_index.name_for(rgb)
+
+
+def closest_xkcd_color_names(rgbs):
+    """Batched closest_xkcd_color_name."""
+    return xkcd_index.names_for(rgbs)
+
+
+def remove_background(image):
+    """256x256 RGBA array of the image with the background made transparent."""
+    # Reuses the request's decoded image; paths are still accepted.
+    # One rembg pass per image, shared by the color and attribute stages
+    prepared = PreparedImage.coerce(image)
+    return prepared.cached(
+        "foreground_rgba",
+        lambda: np.array(remove(prepared.color_input(), session=rembg_sessions.get())),
+    )
+
+
+def foreground_mask(image, alpha_thresh=100, min_area=1000):
+    """256x256 uint8 mask (255 = clothing): alpha above threshold, small blobs dropped."""
+    prepared = PreparedImage.coerce(image)
+
+    def build():
+        alpha_channel = remove_background(prepared)[:, :, 3]
+        mask = (alpha_channel > alpha_thresh).astype(np.uint8) * 255
+
+        contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+        cleaned_mask = np.zeros_like(mask)
+        for contour in contours:
+            if cv2.contourArea(contour) >= min_area:
+                cv2.drawContours(cleaned_mask, [contour], -1, 255, thickness=cv2.FILLED)
+        return cleaned_mask
+
+    return prepared.cached(("foreground_mask", alpha_thresh, min_area), build)
+
+
+def foreground_box(image, padding=0.0):
+    """Fractional (x0, y0, x1, y1) box around the clothing, None if none was found."""
+    return mask_box(foreground_mask(image) > 0, padding)
+
+
+def extract_clothing_pixels(image, alpha_thresh=100, min_area=1000):
+    prepared = PreparedImage.coerce(image)
+    cleaned_mask = foreground_mask(prepared, alpha_thresh, min_area)
+    clothing_pixels = remove_background(prepared)[:, :, :3][cleaned_mask > 0]
     return clothing_pixels
 
 
-def get_top_two_colors(pixels, num_colors=5):
+def get_top_two_colors(pixels, num_colors=5, engine=None):
+    if (engine or COLOR_ENGINE) == "histogram":
+        return dominant_colors(
+            pixels,
+            n_clusters=num_colors,
+            bits=HISTOGRAM_BITS,
+            n_init=HISTOGRAM_N_INIT,
+            refine_iterations=REFINE_ITERATIONS,
+        )
+
     kmeans = KMeans(n_clusters=num_colors, random_state=42)
     labels = kmeans.fit_predict(pixels)
     _, counts = np.unique(labels, return_counts=True)
@@ -50,14 +110,13 @@ def get_top_two_colors(pixels, num_colors=5):
 
 
 # ✅ This is the function you can use in your FastAPI or Flask route
-def get_image_colors(image_path):
+def get_image_colors(image):
     try:
-        pixels = extract_clothing_pixels(image_path)
+        pixels = extract_clothing_pixels(image)
         rgb1, rgb2 = get_top_two_colors(pixels)
         hex1 = "#{:02x}{:02x}{:02x}".format(*rgb1)
         hex2 = "#{:02x}{:02x}{:02x}".format(*rgb2)
-        name1 = closest_xkcd_color_name(rgb1)
-        name2 = closest_xkcd_color_name(rgb2)
+        name1, name2 = closest_xkcd_color_names([rgb1, rgb2])
 
         return {
             "primary_color_name": name1,
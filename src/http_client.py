@@ -0,0 +1,170 @@
+import os
+import random
+import threading
+import time
+import requests
+import toml
+from requests.adapters import HTTPAdapter
+
+# Find base directory (WearPerfect folder)
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Path to config file
+CONFIG_PATH = os.path.join(BASE_DIR, "config", "config.toml")
+
+# Load config
+config = toml.load(CONFIG_PATH)
+
+# Status codes worth retrying: throttling and upstream failures
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class CircuitOpenError(requests.RequestException):
+    """Raised without touching the network while an endpoint's circuit is open."""
+
+
+class CircuitBreaker:
+    """
+    Closed -> open after `failure_threshold` consecutive failures.
+    Open -> half-open after `reset_timeout` seconds, letting one trial call through.
+    Half-open -> closed on success, back to open on failure.
+    """
+
+    def __init__(self, failure_threshold=5, reset_timeout=30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow(self):
+        with self._lock:
+            if self.state == "closed":
+                return True
+            if self.state == "open" and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.state = "half-open"
+            if self.state == "half-open" and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.state = "closed"
+            self.failures = 0
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self._trial_in_flight = False
+            if self.state == "half-open" or self.failures >= self.failure_threshold:
+                self.state = "open"
+                self.opened_at = time.monotonic()
+
+
+class HttpClient:
+    """
+    Shared HTTP client for the external weather/geo APIs.
+
+    One pooled keep-alive Session, per-endpoint (connect, read) timeouts,
+    bounded retries with full-jitter exponential backoff and one circuit
+    breaker per endpoint.
+    """
+
+    def __init__(
+        self,
+        timeouts=None,
+        default_timeout=(3.0, 5.0),
+        max_retries=2,
+        backoff_base=0.2,
+        backoff_max=2.0,
+        failure_threshold=5,
+        reset_timeout=30.0,
+        pool_maxsize=20,
+    ):
+        self.timeouts = {name: tuple(t) for name, t in (timeouts or {}).items()}
+        self.default_timeout = tuple(default_timeout)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.breakers = {}
+        self._breakers_lock = threading.Lock()
+
+        self.session = requests.Session()
+        # Retries are handled here (with jitter), not by urllib3
+        adapter = HTTPAdapter(
+            pool_connections=10, pool_maxsize=pool_maxsize, max_retries=0
+        )
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    @classmethod
+    def from_config(cls, http_config):
+        return cls(
+            timeouts=http_config.get("timeouts", {}),
+            max_retries=http_config.get("max_retries", 2),
+            backoff_base=http_config.get("backoff_base_seconds", 0.2),
+            backoff_max=http_config.get("backoff_max_seconds", 2.0),
+            failure_threshold=http_config.get("breaker_failure_threshold", 5),
+            reset_timeout=http_config.get("breaker_reset_seconds", 30.0),
+            pool_maxsize=http_config.get("pool_maxsize", 20),
+        )
+
+    def breaker(self, endpoint):
+        with self._breakers_lock:
+            if endpoint not in self.breakers:
+                self.breakers[endpoint] = CircuitBreaker(
+                    self.failure_threshold, self.reset_timeout
+                )
+            return self.breakers[endpoint]
+
+    def get(self, endpoint, url, **kwargs):
+        """
+        GET `url` on behalf of `endpoint`.
+
+        Returns the response for any non-retryable status (callers keep their
+        own 4xx handling). Raises CircuitOpenError when the endpoint is failing
+        fast, or the last RequestException once retries are exhausted.
+        """
+        breaker = self.breaker(endpoint)
+        if not breaker.allow():
+            raise CircuitOpenError(f"Circuit open for {endpoint}")
+
+        timeout = self.timeouts.get(endpoint, self.default_timeout)
+        # A half-open trial gets a single attempt so a dead upstream re-opens quickly
+        attempts = 1 if breaker.state == "half-open" else self.max_retries + 1
+        last_error = None
+        for attempt in range(attempts):
+            try:
+                response = self.session.get(url, timeout=timeout, **kwargs)
+                if response.status_code not in RETRY_STATUSES:
+                    breaker.record_success()
+                    return response
+                last_error = requests.HTTPError(
+                    f"{response.status_code} from {endpoint}", response=response
+                )
+            except (requests.ConnectionError, requests.Timeout) as e:
+                last_error = e
+            except requests.RequestException:
+                breaker.record_failure()
+                raise
+
+            if attempt < attempts - 1:
+                delay = min(self.backoff_max, self.backoff_base * 2**attempt)
+                time.sleep(random.uniform(0, delay))
+
+        breaker.record_failure()
+        raise last_error
+
+    def stats(self):
+        return {
+            name: {"state": b.state, "failures": b.failures}
+            for name, b in list(self.breakers.items())
+        }
+
+
+http_client = HttpClient.from_config(config.get("http", {}))
@@ -0,0 +1,77 @@
+import hashlib
+import io
+import os
+import toml
+from src.prepared_image import PreparedImage, open_image
+
+# Find base directory (WearPerfect folder)
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Path to config file
+CONFIG_PATH = os.path.join(BASE_DIR, "config", "config.toml")
+
+# Load config
+config = toml.load(CONFIG_PATH)
+upload_config = config.get("uploads", {})
+MAX_UPLOAD_BYTES = upload_config.get("max_bytes", 20 * 1024 * 1024)
+ALLOWED_FORMATS = set(
+    upload_config.get("allowed_formats", ["JPEG", "PNG", "WEBP", "MPO", "BMP"])
+)
+# Decode JPEGs at reduced resolution (every consumer downsizes anyway)
+REDUCED_DECODE = upload_config.get("reduced_decode", True)
+
+
+class UploadRejected(Exception):
+    """The upload failed validation; `status` is the HTTP status to return."""
+
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+class IngestedImage(PreparedImage):
+    """An upload decoded once from memory, with its original bytes and SHA-256."""
+
+    def __init__(self, data, image, image_format, name=None):
+        super().__init__(image, name=name)
+        self.data = data
+        self.format = image_format
+        self.sha256 = hashlib.sha256(data).hexdigest()
+
+    def persist(self, filepath):
+        """
+        Write the original bytes to filepath. Skips the write if an identical
+        file is already there, and never leaves a partial file behind.
+        """
+        if os.path.exists(filepath):
+            with open(filepath, "rb") as f:
+                if hashlib.sha256(f.read()).hexdigest() == self.sha256:
+                    return filepath
+
+        tmp_path = filepath + ".part"
+        with open(tmp_path, "wb") as f:
+            f.write(self.data)
+        os.replace(tmp_path, filepath)
+        return filepath
+
+
+def ingest_upload(file_storage, name=None):
+    """
+    Read an uploaded file into memory, validate it and hash it.
+    Nothing is written to disk here; the result is the PreparedImage
+    the hash, attribute and color stages share.
+    """
+    data = file_storage.stream.read(MAX_UPLOAD_BYTES + 1)
+    if len(data) > MAX_UPLOAD_BYTES:
+        raise UploadRejected("Image is too large", status=413)
+    if not data:
+        raise UploadRejected("Uploaded image is empty")
+
+    try:
+        image = open_image(io.BytesIO(data), reduced=REDUCED_DECODE)
+    except Exception:
+        raise UploadRejected("Uploaded file is not a valid image")
+
+    if image.format not in ALLOWED_FORMATS:
+        raise UploadRejected(f"Unsupported image format: {image.format}")
+
+    return IngestedImage(data, image, image.format, name=name)
@@ -0,0 +1,118 @@
+"""
+Attribute and color inference for the web app, in-process or via the sidecar.
+
+With [model_server] enabled (or MODEL_SERVER_SOCKET set) the web workers
+never import TensorFlow, rembg or the models; requests go to
+src/model_server.py. If the sidecar cannot be reached (connect refused or
+connection reset) and fallback is on, the worker loads the models itself on
+first use. A sidecar that accepted a request but timed out is an error for
+that request, not a reason to load the models in every worker.
+"""
+
+import os
+from src import model_server
+from src.model_server import ModelServerClient, ModelServerTimeout, ModelServerUnavailable
+
+FALLBACK = model_server.model_server_config.get("fallback", True)
+
+client = ModelServerClient() if model_server.ENABLED else None
+
+if client is None:
+    # In-process mode: importing starts the (eager) model load at boot
+    from src import AttributePred as local_attributes
+    from src import get_color as local_colors
+    from src import clothing_analysis as local_analysis
+else:
+    local_attributes = local_colors = local_analysis = None
+
+_warned = False
+
+
+def _local():
+    """In-process modules, imported on first fallback when using the sidecar."""
+    global local_attributes, local_colors, local_analysis
+    if local_attributes is None:
+        from src import AttributePred as local_attributes
+        from src import get_color as local_colors
+        from src import clothing_analysis as local_analysis
+    return local_attributes, local_colors, local_analysis
+
+
+def _on_unavailable(e):
+    global _warned
+    if not FALLBACK:
+        raise e
+    if not _warned:
+        print(f"Warning: model server unavailable, using in-process models - {e}")
+        _warned = True
+
+
+def _image_bytes(image):
+    """Encoded bytes for an upload (IngestedImage) or an image path."""
+    data = getattr(image, "data", None)
+    if data is not None:
+        return data
+    with open(image, "rb") as f:
+        return f.read()
+
+
+def _image_name(image):
+    return os.path.basename(getattr(image, "name", None) or str(image))
+
+
+def predict_attributes(image, clothing_type):
+    if client is not None:
+        try:
+            return client.attributes(_image_bytes(image), _image_name(image), clothing_type)
+        except ModelServerUnavailable as e:
+            _on_unavailable(e)
+    return _local()[0].get_all_attribute_predictions(image, clothing_type)
+
+
+def predict_colors(image):
+    if client is not None:
+        try:
+            return client.colors(_image_bytes(image))
+        except ModelServerUnavailable as e:
+            _on_unavailable(e)
+    return _local()[1].get_image_colors(image)
+
+
+def analyze(image, clothing_type):
+    """
+    (attributes, colors) for one upload. Background removal runs once and the
+    two stages run in parallel on its mask; see src/clothing_analysis.py.
+    """
+    if client is not None:
+        try:
+            return client.analyze(_image_bytes(image), _image_name(image), clothing_type)
+        except ModelServerUnavailable as e:
+            _on_unavailable(e)
+    return _local()[2].analyze_image(image, clothing_type)
+
+
+def get_models_status():
+    if client is not None:
+        try:
+            status = client.status()
+            status["model_server"] = model_server.SOCKET_PATH
+            return status
+        except ModelServerTimeout as e:
+            return {"state": "model_server_timeout", "ready": False, "error": str(e)}
+        except ModelServerUnavailable as e:
+            if local_attributes is None:
+                # Ready only if this worker may fall back to loading the models itself
+                return {"state": "model_server_unavailable", "ready": FALLBACK, "error": str(e)}
+    return _local()[0].get_attribute_models_status()
+
+
+def get_batching_stats():
+    if client is not None:
+        try:
+            return client.batch_stats()
+        except ModelServerTimeout:
+            return []
+        except ModelServerUnavailable:
+            if local_attributes is None:
+                return []
+    return _local()[0].get_attribute_batching_stats()
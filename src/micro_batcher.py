@@ -0,0 +1,112 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future
+import numpy as np
+
+
+class MicroBatcher:
+    """
+    Dynamic micro-batching in front of a batched predict function.
+
+    Callers submit one preprocessed image and block on the result. A single
+    worker thread takes the first waiting image, keeps collecting until
+    `max_batch_size` images are queued or `max_wait_ms` has passed, runs one
+    forward pass over the stacked batch and hands each caller its own rows.
+
+    `predict_fn(batch)` returns one (N, classes) array per head, or None for
+    a head whose model is missing. Exceptions are re-raised in every caller
+    of that batch.
+    """
+
+    def __init__(self, predict_fn, max_batch_size=8, max_wait_ms=5, name="batcher"):
+        self.predict_fn = predict_fn
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max_wait_ms / 1000.0
+        self.name = name
+        self._queue = queue.Queue()
+        self._worker = None
+        self._start_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self.batches = 0
+        self.items = 0
+        self.max_seen_batch = 0
+        self.max_seen_depth = 0
+        self.batch_size_counts = {}
+        self.total_wait = 0.0
+        self.total_predict = 0.0
+
+    def _ensure_worker(self):
+        # Started on first use so forked server workers each get their own thread
+        with self._start_lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(
+                    target=self._run, name=self.name, daemon=True
+                )
+                self._worker.start()
+
+    def predict(self, image):
+        """Predict a single preprocessed image (H, W, C); returns per-head rows (1, classes)."""
+        self._ensure_worker()
+        future = Future()
+        self._queue.put((image, future, time.monotonic()))
+        depth = self._queue.qsize()
+        with self._stats_lock:
+            self.max_seen_depth = max(self.max_seen_depth, depth)
+        return future.result()
+
+    def _collect(self):
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            started = time.monotonic()
+            try:
+                outputs = self.predict_fn(np.stack([image for image, _, _ in batch]))
+            except Exception as e:
+                for _, future, _ in batch:
+                    future.set_exception(e)
+                outputs = None
+
+            if outputs is not None:
+                for row, (_, future, _) in enumerate(batch):
+                    future.set_result(
+                        [None if head is None else head[row : row + 1] for head in outputs]
+                    )
+
+            with self._stats_lock:
+                size = len(batch)
+                self.batches += 1
+                self.items += size
+                self.max_seen_batch = max(self.max_seen_batch, size)
+                self.batch_size_counts[size] = self.batch_size_counts.get(size, 0) + 1
+                self.total_wait += sum(started - queued for _, _, queued in batch)
+                self.total_predict += time.monotonic() - started
+
+    def stats(self):
+        with self._stats_lock:
+            return {
+                "name": self.name,
+                "max_batch_size": self.max_batch_size,
+                "max_wait_ms": self.max_wait * 1000,
+                "queue_depth": self._queue.qsize(),
+                "max_queue_depth": self.max_seen_depth,
+                "batches": self.batches,
+                "items": self.items,
+                "avg_batch_size": self.items / self.batches if self.batches else 0.0,
+                "max_seen_batch_size": self.max_seen_batch,
+                "batch_size_counts": dict(sorted(self.batch_size_counts.items())),
+                "avg_queue_wait_ms": self.total_wait / self.items * 1000 if self.items else 0.0,
+                "avg_predict_ms": self.total_predict / self.batches * 1000 if self.batches else 0.0,
+            }
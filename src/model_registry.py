@@ -0,0 +1,92 @@
+import hashlib
+import os
+import pickle
+import threading
+import time
+from datetime import datetime
+
+
+def pickle_loader(data):
+    return pickle.loads(data)
+
+
+class ReloadableModel:
+    """
+    A model loaded once per process from a file on disk.
+
+    The file's mtime is checked at most every `check_interval` seconds and the
+    model is reloaded when it changes. Only one thread performs a (re)load; the
+    others keep using the current model until the new one is swapped in.
+    """
+
+    def __init__(self, path, loader=pickle_loader, check_interval=5.0):
+        self.path = path
+        self.loader = loader
+        self.check_interval = check_interval
+        self.model = None
+        self.version = None
+        self.loaded_at = None
+        self._mtime = None
+        self._last_check = 0.0
+        self._lock = threading.Lock()
+
+    def _load(self, mtime):
+        with open(self.path, "rb") as file:
+            data = file.read()
+        model = self.loader(data)
+        # Swap all fields together once the new model is fully loaded
+        self.version = hashlib.sha256(data).hexdigest()[:12]
+        self.loaded_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        self._mtime = mtime
+        self.model = model
+        print(f"Loaded model {self.path} (version {self.version})")
+
+    def get(self):
+        """Return the current model, loading or hot-reloading it if needed."""
+        now = time.monotonic()
+        if self.model is not None and now - self._last_check < self.check_interval:
+            return self.model
+
+        with self._lock:
+            if self.model is not None and now - self._last_check < self.check_interval:
+                return self.model
+            self._last_check = now
+            try:
+                mtime = os.path.getmtime(self.path)
+                if self.model is None or mtime != self._mtime:
+                    self._load(mtime)
+            except Exception as e:
+                if self.model is None:
+                    raise
+                # Keep serving the last good model if the file is missing or mid-write
+                print(f"Warning: Failed to reload {self.path} - {e}")
+            return self.model
+
+    def info(self):
+        return {
+            "path": self.path,
+            "version": self.version,
+            "loaded_at": self.loaded_at,
+            "loaded": self.model is not None,
+        }
+
+
+# Process-wide registry, keyed by model file path
+_models = {}
+_models_lock = threading.Lock()
+
+
+def get_registered_model(path, loader=pickle_loader):
+    """Return the shared ReloadableModel for `path`, creating it on first use."""
+    entry = _models.get(path)
+    if entry is None:
+        with _models_lock:
+            entry = _models.get(path)
+            if entry is None:
+                entry = ReloadableModel(path, loader)
+                _models[path] = entry
+    return entry
+
+
+def registered_models_info():
+    return [entry.info() for entry in list(_models.values())]
@@ -0,0 +1,294 @@
+"""
+Local inference sidecar shared by all web workers.
+
+One process owns the attribute models, the rembg session and the color
+pipeline; gunicorn workers send it encoded upload bytes over a Unix socket
+and stay thin I/O processes.
+
+Wire format (network byte order), one request/response pair at a time on a
+persistent connection:
+
+    request   4s magic b"WPM1" | B op | I payload length | payload
+    response  B status (0 ok, 1 error) | I payload length | payload
+
+    OP_STATUS             ->  JSON model status
+    OP_ATTRIBUTES         B clothing type (0 top, 1 bottom) | H name length |
+                          name | image bytes  ->  JSON attribute dict
+    OP_COLORS             image bytes  ->  JSON color dict
+    OP_REMOVE_BACKGROUND  image bytes  ->  I height | I width | RGBA bytes
+    OP_BATCH_STATS        ->  JSON micro-batcher stats
+    OP_ANALYZE            same payload as OP_ATTRIBUTES  ->  JSON
+                          {"attributes": ..., "colors": ...} (one rembg pass)
+
+Run it with:
+    python -m src.model_server [--socket PATH]
+"""
+
+import io
+import json
+import os
+import socket
+import socketserver
+import struct
+import threading
+import numpy as np
+import toml
+
+# Find base directory (WearPerfect folder)
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Path to config file
+CONFIG_PATH = os.path.join(BASE_DIR, "config", "config.toml")
+
+# Load config
+config = toml.load(CONFIG_PATH)
+model_server_config = config.get("model_server", {})
+# MODEL_SERVER_SOCKET in the environment enables the sidecar with that socket
+SOCKET_PATH = os.getenv("MODEL_SERVER_SOCKET") or model_server_config.get(
+    "socket_path", "/tmp/wearperfect-models.sock"
+)
+ENABLED = bool(os.getenv("MODEL_SERVER_SOCKET")) or model_server_config.get(
+    "enabled", False
+)
+TIMEOUT_SECONDS = model_server_config.get("timeout_seconds", 30)
+
+MAGIC = b"WPM1"
+REQUEST_HEADER = struct.Struct("!4sBI")
+RESPONSE_HEADER = struct.Struct("!BI")
+ATTRIBUTES_HEADER = struct.Struct("!BH")
+IMAGE_SHAPE_HEADER = struct.Struct("!II")
+
+OP_STATUS = 0
+OP_ATTRIBUTES = 1
+OP_COLORS = 2
+OP_REMOVE_BACKGROUND = 3
+OP_BATCH_STATS = 4
+OP_ANALYZE = 5
+
+STATUS_OK = 0
+STATUS_ERROR = 1
+
+CLOTHING_TYPES = ("top", "bottom")
+
+
+class ModelServerUnavailable(Exception):
+    """The sidecar could not be reached (not running, socket gone, timed out)."""
+
+
+class ModelServerError(Exception):
+    """The sidecar was reached but the request failed there."""
+
+
+class ModelServerTimeout(ModelServerError):
+    """
+    The request was sent but no reply came within the timeout. The sidecar is
+    up (just slow or busy), so callers must not fall back to loading the
+    models in-process.
+    """
+
+
+def _recv_exact(sock, size):
+    chunks = []
+    while size:
+        chunk = sock.recv(min(size, 1 << 20))
+        if not chunk:
+            raise ConnectionError("connection closed")
+        chunks.append(chunk)
+        size -= len(chunk)
+    return b"".join(chunks)
+
+
+def _encode_json(value):
+    return json.dumps(value, default=str).encode("utf-8")
+
+
+# ---------------------------------------------------------------- client
+
+
+class ModelServerClient:
+    """One persistent connection per calling thread, reconnected on failure."""
+
+    def __init__(self, socket_path=SOCKET_PATH, timeout=TIMEOUT_SECONDS):
+        self.socket_path = socket_path
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def _connect(self):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        # Blocking connect: waits for backlog space instead of failing with EAGAIN
+        sock.connect(self.socket_path)
+        sock.settimeout(self.timeout)
+        return sock
+
+    def _close(self):
+        sock = getattr(self._local, "sock", None)
+        if sock is not None:
+            sock.close()
+        self._local.sock = None
+
+    def call(self, op, payload=b""):
+        for attempt in range(2):
+            if getattr(self._local, "sock", None) is None:
+                try:
+                    self._local.sock = self._connect()
+                except OSError as e:
+                    # Not running / socket missing / refused
+                    raise ModelServerUnavailable(str(e)) from e
+            sock = self._local.sock
+            try:
+                sock.sendall(REQUEST_HEADER.pack(MAGIC, op, len(payload)) + payload)
+                status, length = RESPONSE_HEADER.unpack(
+                    _recv_exact(sock, RESPONSE_HEADER.size)
+                )
+                body = _recv_exact(sock, length)
+                break
+            except socket.timeout as e:
+                self._close()
+                raise ModelServerTimeout(f"no reply within {self.timeout}s") from e
+            except (OSError, ConnectionError) as e:
+                self._close()
+                # A stale pooled connection gets one retry on a fresh socket
+                if attempt == 1:
+                    raise ModelServerUnavailable(str(e)) from e
+
+        if status != STATUS_OK:
+            raise ModelServerError(body.decode("utf-8", "replace"))
+        return body
+
+    def status(self):
+        return json.loads(self.call(OP_STATUS))
+
+    def batch_stats(self):
+        return json.loads(self.call(OP_BATCH_STATS))
+
+    @staticmethod
+    def _attributes_payload(image_bytes, name, clothing_type):
+        name = name.encode("utf-8")[:65535]
+        code = CLOTHING_TYPES.index(clothing_type) if clothing_type in CLOTHING_TYPES else 255
+        return ATTRIBUTES_HEADER.pack(code, len(name)) + name + image_bytes
+
+    def attributes(self, image_bytes, name, clothing_type):
+        payload = self._attributes_payload(image_bytes, name, clothing_type)
+        return json.loads(self.call(OP_ATTRIBUTES, payload))
+
+    def analyze(self, image_bytes, name, clothing_type):
+        """(attribute dict, color dict) from one request."""
+        payload = self._attributes_payload(image_bytes, name, clothing_type)
+        body = json.loads(self.call(OP_ANALYZE, payload))
+        return body["attributes"], body["colors"]
+
+    def colors(self, image_bytes):
+        return json.loads(self.call(OP_COLORS, image_bytes))
+
+    def remove_background(self, image_bytes):
+        body = self.call(OP_REMOVE_BACKGROUND, image_bytes)
+        height, width = IMAGE_SHAPE_HEADER.unpack_from(body)
+        return np.frombuffer(body, dtype=np.uint8, offset=IMAGE_SHAPE_HEADER.size).reshape(
+            height, width, 4
+        )
+
+
+# ---------------------------------------------------------------- server
+
+
+def _prepare(image_bytes, name=None):
+    # Same decode as the in-process upload path ([uploads] reduced_decode)
+    from src.image_ingest import REDUCED_DECODE
+    from src.prepared_image import PreparedImage, open_image
+
+    return PreparedImage(
+        open_image(io.BytesIO(image_bytes), reduced=REDUCED_DECODE), name=name
+    )
+
+
+def _unpack_attributes(payload):
+    """(PreparedImage, clothing type) from an OP_ATTRIBUTES / OP_ANALYZE payload."""
+    code, name_length = ATTRIBUTES_HEADER.unpack_from(payload)
+    offset = ATTRIBUTES_HEADER.size
+    name = payload[offset : offset + name_length].decode("utf-8")
+    clothing_type = CLOTHING_TYPES[code] if code < len(CLOTHING_TYPES) else ""
+    return _prepare(payload[offset + name_length :], name), clothing_type
+
+
+def handle_request(op, payload):
+    """Run one request in this (server) process and return the response body."""
+    from src import AttributePred, get_color
+
+    if op == OP_STATUS:
+        return _encode_json(AttributePred.get_attribute_models_status())
+    if op == OP_BATCH_STATS:
+        return _encode_json(AttributePred.get_attribute_batching_stats())
+    if op == OP_ATTRIBUTES:
+        image, clothing_type = _unpack_attributes(payload)
+        return _encode_json(AttributePred.get_all_attribute_predictions(image, clothing_type))
+    if op == OP_ANALYZE:
+        from src.clothing_analysis import analyze_image
+
+        attributes, colors = analyze_image(*_unpack_attributes(payload))
+        return _encode_json({"attributes": attributes, "colors": colors})
+    if op == OP_COLORS:
+        return _encode_json(get_color.get_image_colors(_prepare(payload)))
+    if op == OP_REMOVE_BACKGROUND:
+        rgba = np.ascontiguousarray(get_color.remove_background(_prepare(payload)))
+        return IMAGE_SHAPE_HEADER.pack(*rgba.shape[:2]) + rgba.tobytes()
+    raise ValueError(f"Unknown op {op}")
+
+
+class ModelRequestHandler(socketserver.BaseRequestHandler):
+    def handle(self):
+        sock = self.request
+        while True:
+            try:
+                header = _recv_exact(sock, REQUEST_HEADER.size)
+            except (OSError, ConnectionError):
+                return
+            magic, op, length = REQUEST_HEADER.unpack(header)
+            if magic != MAGIC:
+                print("Warning: model server got a bad frame, closing connection")
+                return
+            payload = _recv_exact(sock, length)
+
+            try:
+                status, body = STATUS_OK, handle_request(op, payload)
+            except Exception as e:
+                status, body = STATUS_ERROR, str(e).encode("utf-8")
+            try:
+                sock.sendall(RESPONSE_HEADER.pack(status, len(body)) + body)
+            except OSError:
+                return
+
+
+class ModelServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+    # Every web worker thread keeps its own connection
+    request_queue_size = 128
+
+
+def serve(socket_path=SOCKET_PATH):
+    # Finish loading and warming up every model before binding the socket, in
+    # either load mode: a request must never wait on the load and time out
+    from src import AttributePred, get_color  # noqa: F401
+    from src.rembg_sessions import rembg_sessions
+
+    rembg_sessions.get()
+    state = AttributePred.attribute_models.wait()
+    print(f"Attribute models {state}")
+
+    if os.path.exists(socket_path):
+        os.remove(socket_path)
+    with ModelServer(socket_path, ModelRequestHandler) as server:
+        os.chmod(socket_path, 0o660)
+        print(f"Model server listening on {socket_path}")
+        try:
+            server.serve_forever()
+        finally:
+            if os.path.exists(socket_path):
+                os.remove(socket_path)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Run the local inference sidecar")
+    parser.add_argument("--socket", default=SOCKET_PATH)
+    args = parser.parse_args()
+    serve(args.socket)
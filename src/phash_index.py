@@ -0,0 +1,138 @@
+"""
+Multi-index hash for near-duplicate image detection.
+
+Each 64-bit pHash is stored as an integer and split into four 16-bit bands,
+each with its own SQLite index. If two hashes are within Hamming distance k,
+at least one band differs by no more than k // 4 bits (pigeonhole), so only
+rows matching a probed band value are compared in full.
+"""
+
+from itertools import combinations
+
+N_BANDS = 4
+BAND_BITS = 16
+BAND_MASK = (1 << BAND_BITS) - 1
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS phash_index (
+    item_id INTEGER PRIMARY KEY,
+    user_id TEXT NOT NULL,
+    image_id TEXT NOT NULL,
+    phash INTEGER NOT NULL,
+    b0 INTEGER NOT NULL,
+    b1 INTEGER NOT NULL,
+    b2 INTEGER NOT NULL,
+    b3 INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_phash_b0 ON phash_index (b0);
+CREATE INDEX IF NOT EXISTS idx_phash_b1 ON phash_index (b1);
+CREATE INDEX IF NOT EXISTS idx_phash_b2 ON phash_index (b2);
+CREATE INDEX IF NOT EXISTS idx_phash_b3 ON phash_index (b3);
+"""
+
+
+def hash_to_int(image_hash):
+    """Hex pHash string (as stored by imagehash) -> unsigned 64-bit int."""
+    return int(image_hash, 16)
+
+
+def to_signed(value):
+    # SQLite integers are signed 64-bit
+    return value - (1 << 64) if value >= (1 << 63) else value
+
+
+def to_unsigned(value):
+    return value + (1 << 64) if value < 0 else value
+
+
+def split_bands(value):
+    return [(value >> (BAND_BITS * i)) & BAND_MASK for i in range(N_BANDS)]
+
+
+def band_neighbours(band_value, radius):
+    """All 16-bit values within `radius` bit flips of band_value."""
+    values = [band_value]
+    for flips in range(1, radius + 1):
+        for bits in combinations(range(BAND_BITS), flips):
+            flipped = band_value
+            for bit in bits:
+                flipped ^= 1 << bit
+            values.append(flipped)
+    return values
+
+
+def add_hash(conn, item_id, user_id, image_id, image_hash):
+    """Index one wardrobe item; runs inside the caller's transaction."""
+    if not image_hash:
+        return
+    try:
+        value = hash_to_int(image_hash)
+    except ValueError:
+        print(f"Warning: Invalid image hash for {image_id}: {image_hash}")
+        return
+    conn.execute(
+        "INSERT OR REPLACE INTO phash_index "
+        "(item_id, user_id, image_id, phash, b0, b1, b2, b3) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+        (item_id, user_id, image_id, to_signed(value), *split_bands(value)),
+    )
+
+
+def remove_items(conn, item_ids):
+    conn.executemany(
+        "DELETE FROM phash_index WHERE item_id = ?", [(i,) for i in item_ids]
+    )
+
+
+def backfill(conn):
+    """Index wardrobe rows that are not in the index yet (e.g. older databases)."""
+    rows = conn.execute(
+        "SELECT w.id, w.user_id, w.image_id, w.image_hash FROM wardrobe_items w "
+        "LEFT JOIN phash_index p ON p.item_id = w.id "
+        "WHERE p.item_id IS NULL AND w.image_hash IS NOT NULL AND w.image_hash != ''"
+    ).fetchall()
+    with conn:
+        for row in rows:
+            add_hash(conn, row["id"], row["user_id"], row["image_id"], row["image_hash"])
+    return len(rows)
+
+
+def find_similar(conn, image_hash, max_distance=1, user_id=None):
+    """
+    Items whose pHash is within `max_distance` of image_hash, closest first.
+    Restricted to one user's items when user_id is given.
+
+    Returns:
+        list of dicts with item_id, user_id, image_id and distance
+    """
+    value = hash_to_int(image_hash)
+    radius = max_distance // N_BANDS
+
+    clauses, params = [], []
+    for i, band_value in enumerate(split_bands(value)):
+        probes = band_neighbours(band_value, radius)
+        clauses.append(f"b{i} IN ({', '.join('?' * len(probes))})")
+        params.extend(probes)
+
+    query = (
+        "SELECT item_id, user_id, image_id, phash FROM phash_index "
+        f"WHERE ({' OR '.join(clauses)})"
+    )
+    if user_id is not None:
+        query += " AND user_id = ?"
+        params.append(str(user_id))
+
+    matches = []
+    for row in conn.execute(query, params):
+        distance = bin(value ^ to_unsigned(row["phash"])).count("1")
+        if distance <= max_distance:
+            matches.append(
+                {
+                    "item_id": row["item_id"],
+                    "user_id": row["user_id"],
+                    "image_id": row["image_id"],
+                    "distance": distance,
+                }
+            )
+    matches.sort(key=lambda m: m["distance"])
+    return matches
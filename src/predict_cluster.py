@@ -1,6 +1,6 @@
-import joblib
 import numpy as np
-import os
+from src.soft_labels import compute_soft_labels as compute_soft_labels_batch
+from src.weather_suitability_clustering import topwear_cluster_artifact
 
 
 def compute_soft_labels(X_np, centroids, categorical_indices):
@@ -15,22 +15,7 @@ def compute_soft_labels(X_np, centroids, categorical_indices):
     Returns:
     - proximity: numpy array of shape (n_clusters,) with proximity scores
     """
-    distances = []
-    row = X_np[0]  # Extract the single row (since X_np is shape (1, n_features))
-
-    for center in centroids:
-        d = 0
-        for i in range(len(row)):
-            if i in categorical_indices:
-                d += row[i] != center[i]  # Boolean treated as 0 or 1
-            else:
-                d += (float(row[i]) - float(center[i])) ** 2
-        distances.append(np.sqrt(d))
-
-    distances = np.array(distances)
-    proximity = 1 / (distances + 1e-6)  # Avoid division by zero
-    proximity /= proximity.sum()  # Normalize to sum to 1
-    return proximity
+    return compute_soft_labels_batch(X_np, centroids, categorical_indices)[0]
 
 
 def predict_weather_cluster(new_data_row):
@@ -50,19 +35,18 @@ def predict_weather_cluster(new_data_row):
     - hard_cluster: Predicted cluster index
     - weather_tags: List of weather tags based on proximity
     """
-    # Define base path for model files
-    base_path = r"C:\Users\arajaram\OneDrive - Maryland Department of Transportation(MDOT)\Desktop\Capstone project\chatbot for Project\Models\seasonality_clustering"
+    # Fitted artifact built by models_factory/topwear_weather_clustering_model.py
+    artifact = topwear_cluster_artifact
+    if artifact is None:
+        raise FileNotFoundError("Top wear cluster model has not been built")
 
-    # Load saved components
-    kproto = joblib.load(os.path.join(base_path, "kproto_topwear_model.pkl"))
-    centroids = joblib.load(os.path.join(base_path, "kproto_topwear_centroids.pkl"))
-    cat_cols = joblib.load(os.path.join(base_path, "kproto_topwear_cat_indices.pkl"))
-    config = joblib.load(os.path.join(base_path, "kproto_topwear_config.pkl"))
+    kproto = artifact["kproto"]
+    centroids = artifact["centroids"]
 
     # Extract configuration
-    cluster_to_weather = config["cluster_to_weather"]
-    numerical_cols = config["numerical_cols"]
-    categorical_cols = config["categorical_cols"]
+    cluster_to_weather = artifact["cluster_to_weather"]
+    numerical_cols = artifact["numerical_cols"]
+    categorical_cols = artifact["categorical_cols"]
     threshold = 0.25
 
     try:
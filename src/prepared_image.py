@@ -0,0 +1,147 @@
+import os
+import threading
+import cv2
+import imagehash
+import numpy as np
+from PIL import Image, ImageOps
+
+# Input size of the attribute models
+ATTRIBUTE_INPUT_SIZE = (128, 128)
+# Working size for background removal / color extraction
+COLOR_INPUT_SIZE = (256, 256)
+# Smallest decode that still covers every consumer (pHash works at 32x32)
+DECODE_SIZE = COLOR_INPUT_SIZE
+# Formats libjpeg can decode at 1/2, 1/4 or 1/8 scale
+DRAFT_FORMATS = {"JPEG", "MPO"}
+
+
+def open_image(fp, reduced=True):
+    """
+    Open and fully decode an image.
+
+    With reduced=True JPEGs use libjpeg DCT scaling (PIL draft mode) to decode
+    straight to the smallest power-of-two reduction that is still at least
+    DECODE_SIZE, so a 12MP phone photo never materialises at full resolution.
+    """
+    image = Image.open(fp)
+    if reduced and image.format in DRAFT_FORMATS:
+        image.draft(image.mode, DECODE_SIZE)
+    image.load()
+    return image
+
+
+class PreparedImage:
+    """
+    One decoded image shared by the hash, attribute and color stages.
+
+    The source is decoded once; derived inputs (pHash, the 128x128 model input,
+    the 256x256 RGBA color input, the foreground mask) are computed on first use
+    and cached. The cache is locked, so stages running in parallel threads build
+    each input once.
+    """
+
+    def __init__(self, image, name=None):
+        self.image = image
+        self.name = name or getattr(image, "filename", None) or "image"
+        self._cache = {}
+        self._lock = threading.RLock()
+
+    @classmethod
+    def from_path(cls, path, reduced=True):
+        image = open_image(path, reduced=reduced)
+        return cls(image, name=os.path.basename(path))
+
+    @classmethod
+    def coerce(cls, source):
+        """Accept a PreparedImage or an image path (the older call style)."""
+        if isinstance(source, PreparedImage):
+            return source
+        return cls.from_path(source)
+
+    def _cached(self, key, build):
+        if key not in self._cache:
+            with self._lock:
+                if key not in self._cache:
+                    self._cache[key] = build()
+        return self._cache[key]
+
+    def cached(self, key, build):
+        """Cache a value computed by another stage (e.g. the foreground mask)."""
+        return self._cached(key, build)
+
+    @property
+    def phash(self):
+        """
+        pHash string of the image as decoded, without EXIF rotation. With a
+        reduced (draft mode) decode this can differ from hashes stored from
+        full decodes until `python -m src.wardrobe_store --rehash-uploads` is run.
+        """
+        return self._cached("phash", lambda: str(imagehash.phash(self.image)))
+
+    @property
+    def upright(self):
+        """The image with its EXIF orientation applied."""
+        return self._cached("upright", lambda: ImageOps.exif_transpose(self.image))
+
+    @property
+    def rgb(self):
+        """
+        Upright RGB uint8 array. EXIF orientation is applied, as cv2.imread
+        did for the attribute models.
+        """
+        return self._cached("rgb", lambda: np.asarray(self.upright.convert("RGB")))
+
+    def attribute_input(self, box=None):
+        """
+        128x128 float RGB in [0, 1], the attribute models' input.
+
+        box is an optional (x0, y0, x1, y1) crop in fractions of the image
+        size, e.g. from mask_box(); the crop is taken at full resolution.
+        """
+        return self._cached(
+            ("attribute_input", box),
+            lambda: cv2.resize(crop_box(self.rgb, box), ATTRIBUTE_INPUT_SIZE) / 255.0,
+        )
+
+    def color_input(self):
+        """
+        256x256 RGBA PIL image fed to background removal. It is upright, so
+        masks computed on it line up with rgb / attribute_input().
+        """
+        return self._cached(
+            "color_input",
+            lambda: self.upright.convert("RGBA").resize(COLOR_INPUT_SIZE),
+        )
+
+
+def mask_box(mask, padding=0.0):
+    """
+    Bounding box of a 2D mask as (x0, y0, x1, y1) fractions of its size,
+    grown by `padding` of the box size on each side. None if the mask is empty.
+    """
+    rows = np.flatnonzero(mask.any(axis=1))
+    cols = np.flatnonzero(mask.any(axis=0))
+    if not len(rows):
+        return None
+    height, width = mask.shape[:2]
+    x0, x1 = cols[0] / width, (cols[-1] + 1) / width
+    y0, y1 = rows[0] / height, (rows[-1] + 1) / height
+    pad_x, pad_y = (x1 - x0) * padding, (y1 - y0) * padding
+    return (
+        round(float(max(0.0, x0 - pad_x)), 4),
+        round(float(max(0.0, y0 - pad_y)), 4),
+        round(float(min(1.0, x1 + pad_x)), 4),
+        round(float(min(1.0, y1 + pad_y)), 4),
+    )
+
+
+def crop_box(array, box):
+    """Crop an HxW(xC) array to a fractional box; the whole array if box is None."""
+    if box is None:
+        return array
+    height, width = array.shape[:2]
+    x0, y0, x1, y1 = box
+    left, top = int(x0 * width), int(y0 * height)
+    right = max(left + 1, int(np.ceil(x1 * width)))
+    bottom = max(top + 1, int(np.ceil(y1 * height)))
+    return array[top:bottom, left:right]
@@ -0,0 +1,72 @@
+import os
+import threading
+import toml
+
+# Find base directory (WearPerfect folder)
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Path to config file
+CONFIG_PATH = os.path.join(BASE_DIR, "config", "config.toml")
+
+# Load config
+config = toml.load(CONFIG_PATH)
+rembg_config = config.get("rembg", {})
+REMBG_MODEL = rembg_config.get("model", "u2net")
+INTRA_OP_THREADS = rembg_config.get("intra_op_threads", 1)
+INTER_OP_THREADS = rembg_config.get("inter_op_threads", 1)
+
+
+def _session_options(intra_op_threads, inter_op_threads):
+    import onnxruntime as ort
+
+    options = ort.SessionOptions()
+    options.intra_op_num_threads = intra_op_threads
+    options.inter_op_num_threads = inter_op_threads
+    options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+    return options
+
+
+def create_session(model_name, intra_op_threads=1, inter_op_threads=1):
+    """A rembg session for model_name with explicit ONNX Runtime thread settings."""
+    from rembg import new_session
+    from rembg.sessions import sessions_class
+
+    options = _session_options(intra_op_threads, inter_op_threads)
+    for session_class in sessions_class:
+        if session_class.name() == model_name:
+            return session_class(model_name, options)
+    # Unknown to this rembg version's class list: let rembg resolve it
+    return new_session(model_name)
+
+
+class RembgSessionPool:
+    """
+    Process-wide rembg sessions, created once per model name.
+
+    An ONNX Runtime session can be run from several threads at once, so one
+    session per model is shared by every request; only creation is locked.
+    """
+
+    def __init__(self, intra_op_threads=1, inter_op_threads=1):
+        self.intra_op_threads = intra_op_threads
+        self.inter_op_threads = inter_op_threads
+        self._sessions = {}
+        self._lock = threading.Lock()
+
+    def get(self, model_name=REMBG_MODEL):
+        session = self._sessions.get(model_name)
+        if session is None:
+            with self._lock:
+                session = self._sessions.get(model_name)
+                if session is None:
+                    session = create_session(
+                        model_name, self.intra_op_threads, self.inter_op_threads
+                    )
+                    self._sessions[model_name] = session
+                    print(f"Created rembg session for {model_name}")
+        return session
+
+    def models(self):
+        return list(self._sessions)
+
+
+rembg_sessions = RembgSessionPool(INTRA_OP_THREADS, INTER_OP_THREADS)
@@ -0,0 +1,66 @@
+import numpy as np
+
+
+def encode_mixed_features(X_np, centroids, categorical_indices):
+    """
+    Split rows and centroids into a float matrix of numerical features and an
+    int matrix of categorical codes.
+
+    Categorical values are encoded against one shared vocabulary so that equal
+    codes mean equal strings in any column.
+
+    Returns:
+    - X_num: (N, n_num) float array
+    - X_cat: (N, n_cat) int array
+    - C_num: (K, n_num) float array
+    - C_cat: (K, n_cat) int array
+    """
+    X_np = np.asarray(X_np, dtype=object)
+    if X_np.ndim == 1:
+        X_np = X_np.reshape(1, -1)
+    centroids = np.asarray(centroids, dtype=object)
+
+    cat_mask = np.zeros(X_np.shape[1], dtype=bool)
+    cat_mask[list(categorical_indices)] = True
+
+    X_num = X_np[:, ~cat_mask].astype(float)
+    C_num = centroids[:, ~cat_mask].astype(float)
+
+    X_cat_str = X_np[:, cat_mask].astype(str)
+    C_cat_str = centroids[:, cat_mask].astype(str)
+    _, codes = np.unique(
+        np.concatenate([X_cat_str.ravel(), C_cat_str.ravel()]), return_inverse=True
+    )
+    X_cat = codes[: X_cat_str.size].reshape(X_cat_str.shape)
+    C_cat = codes[X_cat_str.size :].reshape(C_cat_str.shape)
+
+    return X_num, X_cat, C_num, C_cat
+
+
+def compute_soft_labels(X_np, centroids, categorical_indices):
+    """
+    Compute soft labels (proximity scores) for a batch of rows against every
+    cluster centroid.
+
+    The distance is sqrt(squared euclidean on numerical features + number of
+    categorical mismatches), and proximity is its inverse normalised to sum to 1.
+
+    Parameters:
+    - X_np: array of shape (N, n_features), or (n_features,) for a single row
+    - centroids: array of shape (n_clusters, n_features)
+    - categorical_indices: indices of categorical columns in X_np
+
+    Returns:
+    - soft_labels: numpy array of shape (N, n_clusters)
+    """
+    X_num, X_cat, C_num, C_cat = encode_mixed_features(
+        X_np, centroids, categorical_indices
+    )
+
+    num_dist = ((X_num[:, None, :] - C_num[None, :, :]) ** 2).sum(axis=2)
+    cat_dist = (X_cat[:, None, :] != C_cat[None, :, :]).sum(axis=2)
+
+    distances = np.sqrt(num_dist + cat_dist)
+    proximity = 1 / (distances + 1e-6)  # Avoid division by zero
+    proximity /= proximity.sum(axis=1, keepdims=True)
+    return proximity
@@ -0,0 +1,113 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class TTLCache:
+    """
+    Bounded, thread-safe TTL cache with stale-while-revalidate.
+
+    - Entries younger than `ttl` are served directly.
+    - Entries older than `ttl` but younger than `ttl + stale_ttl` are served
+      as-is while one background thread refreshes them.
+    - Anything older, or missing, is loaded synchronously.
+
+    Loaders returning None are treated as failures and never cached.
+    The least recently used entry is evicted once `maxsize` is reached.
+    """
+
+    def __init__(self, maxsize=512, ttl=600, stale_ttl=1800, name="cache"):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.name = name
+        self._data = OrderedDict()  # key -> (value, stored_at)
+        self._refreshing = set()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.refresh_failures = 0
+
+    def _store(self, key, value):
+        with self._lock:
+            self._data[key] = (value, time.monotonic())
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def _refresh(self, key, loader):
+        value = None
+        try:
+            value = loader()
+        except Exception as e:
+            print(f"Warning: {self.name} refresh failed for {key} - {e}")
+
+        if value is not None:
+            self._store(key, value)
+        with self._lock:
+            if value is None:
+                self.refresh_failures += 1
+            self._refreshing.discard(key)
+
+    def get_or_load(self, key, loader):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                value, stored_at = entry
+                age = now - stored_at
+                if age < self.ttl:
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return value
+                if age < self.ttl + self.stale_ttl:
+                    self._data.move_to_end(key)
+                    self.stale_hits += 1
+                    if key not in self._refreshing:
+                        self._refreshing.add(key)
+                        threading.Thread(
+                            target=self._refresh, args=(key, loader), daemon=True
+                        ).start()
+                    return value
+                del self._data[key]
+            self.misses += 1
+
+        value = loader()
+        if value is not None:
+            self._store(key, value)
+        return value
+
+    def get(self, key):
+        """Return a fresh cached value without loading, or None."""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None and time.monotonic() - entry[1] < self.ttl:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            self.misses += 1
+            return None
+
+    def set(self, key, value):
+        if value is not None:
+            self._store(key, value)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self):
+        with self._lock:
+            size = len(self._data)
+        lookups = self.hits + self.stale_hits + self.misses
+        return {
+            "name": self.name,
+            "size": size,
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "refresh_failures": self.refresh_failures,
+            "hit_rate": (self.hits + self.stale_hits) / lookups if lookups else 0.0,
+        }
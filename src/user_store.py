@@ -0,0 +1,116 @@
+import csv
+import os
+import sqlite3
+import toml
+from src import db
+
+# Find base directory (WearPerfect folder)
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Path to config file
+CONFIG_PATH = os.path.join(BASE_DIR, "config", "config.toml")
+
+# Load config
+config = toml.load(CONFIG_PATH)
+users_db = config["paths"].get("users_db", "data/wardrobe.db")
+users_csv = config["paths"]["users_csv"]
+
+# username_key is the case-folded username, so lookups and uniqueness are case-insensitive
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS users (
+    user_id TEXT PRIMARY KEY,
+    username TEXT NOT NULL,
+    username_key TEXT NOT NULL UNIQUE,
+    password TEXT NOT NULL,
+    gender TEXT
+);
+"""
+
+
+def username_key(username):
+    return username.strip().casefold()
+
+
+def _import_if_empty(db_path):
+    import_from_csv(if_empty=True, db_path=db_path)
+
+
+def get_connection(db_path=users_db):
+    db.ensure_schema(db_path, "users", SCHEMA, on_create=_import_if_empty)
+    return db.get_connection(db_path)
+
+
+def get_user_by_username(username, db_path=users_db):
+    """Return the user dict (user_id, username, password, gender) or None."""
+    conn = get_connection(db_path)
+    record = conn.execute(
+        "SELECT user_id, username, password, gender FROM users WHERE username_key = ?",
+        (username_key(username),),
+    ).fetchone()
+    return dict(record) if record else None
+
+
+def get_user_by_id(user_id, db_path=users_db):
+    conn = get_connection(db_path)
+    record = conn.execute(
+        "SELECT user_id, username, password, gender FROM users WHERE user_id = ?",
+        (user_id,),
+    ).fetchone()
+    return dict(record) if record else None
+
+
+def _insert_user(conn, user_id, username, password_hash, gender):
+    conn.execute(
+        "INSERT INTO users (user_id, username, username_key, password, gender) "
+        "VALUES (?, ?, ?, ?, ?)",
+        (user_id, username, username_key(username), password_hash, gender or ""),
+    )
+
+
+def create_user(user_id, username, password_hash, gender, db_path=users_db):
+    """Insert a user. Returns False if the username is already taken."""
+    conn = get_connection(db_path)
+    try:
+        with conn:
+            _insert_user(conn, user_id, username, password_hash, gender)
+    except sqlite3.IntegrityError:
+        return False
+    return True
+
+
+def set_password(username, password_hash, db_path=users_db):
+    """Update a user's password hash. Returns False if the user does not exist."""
+    conn = get_connection(db_path)
+    with conn:
+        cursor = conn.execute(
+            "UPDATE users SET password = ? WHERE username_key = ?",
+            (password_hash, username_key(username)),
+        )
+    return cursor.rowcount > 0
+
+
+def import_from_csv(csv_file=users_csv, if_empty=False, db_path=users_db):
+    """
+    One-shot import of the legacy users CSV, in a single transaction; existing
+    usernames are skipped. With if_empty=True nothing happens unless the table
+    is empty (checked under the write lock, so concurrent workers import once).
+    """
+    if not os.path.exists(csv_file):
+        return 0
+
+    conn = get_connection(db_path)
+    imported = 0
+    with db.immediate_transaction(conn):
+        if if_empty and conn.execute("SELECT COUNT(*) FROM users").fetchone()[0]:
+            return 0
+        with open(csv_file, mode="r", newline="") as f:
+            for row in csv.DictReader(f):
+                try:
+                    _insert_user(
+                        conn, row["user_id"], row["username"], row["password"],
+                        row.get("gender", ""),
+                    )
+                except sqlite3.IntegrityError:
+                    continue
+                imported += 1
+    print(f"Imported {imported} users from {csv_file} into {db_path}")
+    return imported
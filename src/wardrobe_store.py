@@ -0,0 +1,256 @@
+import csv
+import json
+import os
+import toml
+from src import db, phash_index
+
+# Find base directory (WearPerfect folder)
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Path to config file
+CONFIG_PATH = os.path.join(BASE_DIR, "config", "config.toml")
+
+# Load config
+config = toml.load(CONFIG_PATH)
+wardrobe_db = config["paths"].get("wardrobe_db", "data/wardrobe.db")
+upload_folder = config["paths"]["UPLOAD_FOLDER"]
+top_wear_csv = config["paths"]["top_wear_csv"]
+bottom_wear_csv = config["paths"]["bottom_wear_csv"]
+
+# Near-duplicate detection: Hamming distance threshold and "global" or "user" scope
+dedup_config = config.get("dedup", {})
+DEDUP_MAX_DISTANCE = dedup_config.get("max_distance", 1)
+DEDUP_SCOPE = dedup_config.get("scope", "global")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS wardrobe_items (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id TEXT NOT NULL,
+    image_id TEXT NOT NULL,
+    clothing_type TEXT NOT NULL,
+    image_hash TEXT,
+    weather_tags TEXT,
+    timestamp TEXT,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_wardrobe_user ON wardrobe_items (user_id);
+CREATE INDEX IF NOT EXISTS idx_wardrobe_user_type ON wardrobe_items (user_id, clothing_type);
+CREATE INDEX IF NOT EXISTS idx_wardrobe_image ON wardrobe_items (image_id);
+"""
+
+
+def _on_create(db_path):
+    conn = db.get_connection(db_path)
+    conn.executescript(phash_index.SCHEMA)
+    phash_index.backfill(conn)
+    # First run against an empty database: bring the CSV wardrobe over
+    import_from_csvs(if_empty=True, db_path=db_path)
+
+
+def get_connection(db_path=wardrobe_db):
+    db.ensure_schema(db_path, "wardrobe_items", SCHEMA, on_create=_on_create)
+    return db.get_connection(db_path)
+
+
+def _to_row(record):
+    return json.loads(record["data"])
+
+
+def _insert_item(conn, row, fieldnames=None):
+    """Insert one wardrobe row and index its hash, in the caller's transaction."""
+    fieldnames = fieldnames or list(row.keys())
+    data = {
+        field: "" if row.get(field) is None else str(row.get(field))
+        for field in fieldnames
+    }
+    cursor = conn.execute(
+        "INSERT INTO wardrobe_items "
+        "(user_id, image_id, clothing_type, image_hash, weather_tags, timestamp, data) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?)",
+        (
+            data.get("user_id", ""),
+            data.get("image_id", ""),
+            data.get("clothing_type", ""),
+            data.get("image_hash", ""),
+            data.get("weather_tags", ""),
+            data.get("timestamp", ""),
+            json.dumps(data),
+        ),
+    )
+    phash_index.add_hash(
+        conn,
+        cursor.lastrowid,
+        data.get("user_id", ""),
+        data.get("image_id", ""),
+        data.get("image_hash", ""),
+    )
+
+
+def add_item(row, fieldnames=None, db_path=wardrobe_db):
+    """
+    Store one wardrobe row (the dict the CSV writer used to receive).
+    Values are stored as strings so reads look exactly like csv.DictReader rows.
+    """
+    conn = get_connection(db_path)
+    with conn:
+        _insert_item(conn, row, fieldnames)
+
+
+def get_user_items(user_id, clothing_type=None, db_path=wardrobe_db):
+    """All rows for a user (optionally one clothing type), oldest first."""
+    conn = get_connection(db_path)
+    if clothing_type:
+        cursor = conn.execute(
+            "SELECT data FROM wardrobe_items WHERE user_id = ? AND clothing_type = ? "
+            "ORDER BY id",
+            (str(user_id), clothing_type.lower()),
+        )
+    else:
+        cursor = conn.execute(
+            "SELECT data FROM wardrobe_items WHERE user_id = ? ORDER BY id",
+            (str(user_id),),
+        )
+    return [_to_row(record) for record in cursor]
+
+
+def find_similar_images(image_hash, user_id=None, db_path=wardrobe_db):
+    """
+    Stored items within DEDUP_MAX_DISTANCE of image_hash, using the pHash index.
+    With the "user" scope only user_id's own items are considered.
+    """
+    conn = get_connection(db_path)
+    return phash_index.find_similar(
+        conn,
+        image_hash,
+        max_distance=DEDUP_MAX_DISTANCE,
+        user_id=user_id if DEDUP_SCOPE == "user" else None,
+    )
+
+
+def delete_item(user_id, image_id, db_path=wardrobe_db):
+    """Delete a user's item by image_id. Returns the number of rows removed."""
+    conn = get_connection(db_path)
+    with conn:
+        item_ids = [
+            record["id"]
+            for record in conn.execute(
+                "SELECT id FROM wardrobe_items WHERE user_id = ? AND image_id = ?",
+                (str(user_id), image_id),
+            )
+        ]
+        phash_index.remove_items(conn, item_ids)
+        conn.executemany(
+            "DELETE FROM wardrobe_items WHERE id = ?", [(i,) for i in item_ids]
+        )
+    return len(item_ids)
+
+
+def count_items(db_path=wardrobe_db):
+    conn = get_connection(db_path)
+    return conn.execute("SELECT COUNT(*) FROM wardrobe_items").fetchone()[0]
+
+
+def import_from_csvs(csv_files=None, replace=False, if_empty=False, db_path=wardrobe_db):
+    """
+    One-shot import of the legacy wardrobe CSVs, in a single transaction.
+    With replace=True the table is emptied first, otherwise rows are appended.
+    With if_empty=True nothing happens unless the table is empty; the check
+    holds the write lock, so workers starting together import only once.
+    """
+    csv_files = csv_files or [top_wear_csv, bottom_wear_csv]
+    conn = get_connection(db_path)
+
+    imported = 0
+    with db.immediate_transaction(conn):
+        if if_empty and conn.execute("SELECT COUNT(*) FROM wardrobe_items").fetchone()[0]:
+            return 0
+        if replace:
+            conn.execute("DELETE FROM wardrobe_items")
+            conn.execute("DELETE FROM phash_index")
+
+        for csv_file in csv_files:
+            if not os.path.exists(csv_file):
+                continue
+            with open(csv_file, mode="r", newline="") as f:
+                reader = csv.DictReader(f)
+                for row in reader:
+                    row = {k: v for k, v in row.items() if k is not None}
+                    _insert_item(conn, row, reader.fieldnames)
+                    imported += 1
+            print(f"Imported {csv_file} into {db_path}")
+    return imported
+
+
+def rehash_uploads(upload_root=upload_folder, dry_run=False, db_path=wardrobe_db):
+    """
+    Recompute stored pHashes from the saved uploads with the decode mode the
+    upload path uses ([uploads] reduced_decode), so a re-upload of the same
+    file hashes identically. Rows whose file is missing keep their hash.
+
+    Returns:
+        (rows rehashed, rows whose hash changed, rows without a file)
+    """
+    from src import user_store
+    from src.image_ingest import REDUCED_DECODE
+    from src.prepared_image import PreparedImage
+
+    conn = get_connection(db_path)
+    records = conn.execute(
+        "SELECT id, user_id, image_id, image_hash, data FROM wardrobe_items"
+    ).fetchall()
+    usernames = {}
+    rehashed = changed = missing = 0
+    for record in records:
+        user_id = record["user_id"]
+        if user_id not in usernames:
+            user = user_store.get_user_by_id(user_id)
+            usernames[user_id] = user["username"] if user else user_id
+        path = os.path.join(upload_root, usernames[user_id], record["image_id"])
+        if not os.path.exists(path):
+            missing += 1
+            continue
+
+        try:
+            image_hash = PreparedImage.from_path(path, reduced=REDUCED_DECODE).phash
+        except Exception as e:
+            print(f"Warning: Could not hash {path} - {e}")
+            missing += 1
+            continue
+        rehashed += 1
+        if image_hash == record["image_hash"]:
+            continue
+        changed += 1
+        print(f"{path}: {record['image_hash']} -> {image_hash}")
+        if dry_run:
+            continue
+
+        data = json.loads(record["data"])
+        data["image_hash"] = image_hash
+        with conn:
+            conn.execute(
+                "UPDATE wardrobe_items SET image_hash = ?, data = ? WHERE id = ?",
+                (image_hash, json.dumps(data), record["id"]),
+            )
+            phash_index.add_hash(conn, record["id"], user_id, record["image_id"], image_hash)
+    return rehashed, changed, missing
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Import wardrobe CSVs into SQLite")
+    parser.add_argument("csv_files", nargs="*")
+    parser.add_argument("--replace", action="store_true", help="empty the table first")
+    parser.add_argument(
+        "--rehash-uploads",
+        action="store_true",
+        help="recompute stored pHashes from the files in the upload folder instead",
+    )
+    parser.add_argument("--dry-run", action="store_true", help="with --rehash-uploads")
+    args = parser.parse_args()
+
+    if args.rehash_uploads:
+        rehashed, changed, missing = rehash_uploads(dry_run=args.dry_run)
+        print(f"Rehashed {rehashed} rows ({changed} changed), {missing} without an upload")
+    else:
+        count = import_from_csvs(args.csv_files or None, replace=args.replace)
+        print(f"Imported {count} rows, {count_items()} rows in {wardrobe_db}")
@@ -1,10 +1,13 @@
 import requests
-import pandas as pd
-import pickle
+import ipaddress
 import json
 from datetime import datetime
 import os
 import toml
+from src.model_registry import get_registered_model
+from src.weather_classifier import load_weather_classifier, normalize_weather_record
+from src.ttl_cache import TTLCache
+from src.http_client import http_client
 
 
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
@@ -26,12 +29,97 @@ weather_suitability_model = config["paths"]["weather_suitability_model"]
 
 WEATHER_API_KEY = config.get("weather", {}).get("api_key")
 
+# Upstream endpoints (overridable, e.g. to point at a local stub server)
+WEATHER_API_BASE_URL = config.get("weather", {}).get(
+    "api_base_url", "http://api.weatherapi.com/v1"
+)
+GEO_API_URL = config.get("geo", {}).get("api_url", "https://ipinfo.io")
 
+# Weather changes on a scale of minutes, so responses are shared across users
+weather_config = config.get("weather", {})
+current_weather_cache = TTLCache(
+    maxsize=weather_config.get("cache_max_entries", 512),
+    ttl=weather_config.get("cache_ttl_seconds", 600),
+    stale_ttl=weather_config.get("cache_stale_seconds", 1800),
+    name="current_weather",
+)
+forecast_weather_cache = TTLCache(
+    maxsize=weather_config.get("cache_max_entries", 512),
+    ttl=weather_config.get("forecast_cache_ttl_seconds", 3600),
+    stale_ttl=weather_config.get("cache_stale_seconds", 1800),
+    name="forecast_weather",
+)
 
-def get_location():
-    """Fetch user's location using ipinfo.io API."""
+
+# Locations change far less often than weather; keyed by client IP
+geo_config = config.get("geo", {})
+location_cache = TTLCache(
+    maxsize=geo_config.get("cache_max_entries", 4096),
+    ttl=geo_config.get("cache_ttl_seconds", 86400),
+    stale_ttl=geo_config.get("cache_stale_seconds", 86400),
+    name="geo_location",
+)
+# Browser coordinates are snapped to this grid so nearby users share a cache entry
+GRID_DEGREES = geo_config.get("grid_degrees", 0.1)
+
+
+def normalize_city(city):
+    """Cache key for a city name: trimmed, case-folded, single-spaced."""
+    return " ".join(str(city).split()).casefold()
+
+
+def get_weather_cache_stats():
+    return [
+        current_weather_cache.stats(),
+        forecast_weather_cache.stats(),
+        location_cache.stats(),
+    ]
+
+
+def get_upstream_stats():
+    """Circuit breaker state per external endpoint."""
+    return http_client.stats()
+
+
+
+def is_public_ip(ip):
+    try:
+        return ipaddress.ip_address(ip).is_global
+    except ValueError:
+        return False
+
+
+def snap_to_grid(latitude, longitude, grid=GRID_DEGREES):
+    """Round coordinates to the centre of a coarse grid cell, or None if invalid."""
     try:
-        response = requests.get("https://ipinfo.io", timeout=5)
+        latitude, longitude = float(latitude), float(longitude)
+    except (TypeError, ValueError):
+        return None
+    if not (-90 <= latitude <= 90 and -180 <= longitude <= 180):
+        return None
+    return (
+        round(round(latitude / grid) * grid, 4),
+        round(round(longitude / grid) * grid, 4),
+    )
+
+
+def get_location(client_ip=None):
+    """
+    User's location, resolved once per client IP and cached.
+
+    Private or missing IPs (local development) resolve the server's own IP,
+    as before.
+    """
+    if client_ip and is_public_ip(client_ip):
+        return location_cache.get_or_load(client_ip, lambda: fetch_location(client_ip))
+    return location_cache.get_or_load("server", lambda: fetch_location())
+
+
+def fetch_location(client_ip=None):
+    """Fetch a location using ipinfo.io API."""
+    url = f"{GEO_API_URL}/{client_ip}/json" if client_ip else GEO_API_URL
+    try:
+        response = http_client.get("geo", url)
         response.raise_for_status()
         data = response.json()
         loc = data["loc"].split(",")
@@ -44,17 +132,23 @@ def get_location():
         return None
 
 def get_weather(city):
-    print("Using WEATHER_API_KEY:", WEATHER_API_KEY)
-    print("Fetching weather for city:", city)
-
-    """Fetch current weather data for a given city."""
+    """Current weather data for a given city, served from the TTL cache."""
     if not city or not WEATHER_API_KEY:
         return None
 
-    url = f"http://api.weatherapi.com/v1/current.json?key={WEATHER_API_KEY}&q={city}&aqi=no"
+    return current_weather_cache.get_or_load(
+        normalize_city(city), lambda: fetch_weather(city)
+    )
+
+
+def fetch_weather(city):
+    """Fetch current weather data for a given city."""
+    print("Fetching weather for city:", city)
+
+    url = f"{WEATHER_API_BASE_URL}/current.json?key={WEATHER_API_KEY}&q={city}&aqi=no"
 
     try:
-        response = requests.get(url, timeout=5)
+        response = http_client.get("weather_current", url)
         response.raise_for_status()
         data = response.json()
 
@@ -90,11 +184,14 @@ def get_weather(city):
 
 
 
+def get_weather_classifier(model_path=weather_suitability_model):
+    return get_registered_model(model_path, loader=load_weather_classifier).get()
+
+
 def predict_weather(input_data, model_path=weather_suitability_model):
     """Predict weather type using a trained model."""
     try:
-        with open(model_path, "rb") as file:
-            model = pickle.load(file)
+        model = get_weather_classifier(model_path)
     except FileNotFoundError:
         return None
 
@@ -106,21 +203,34 @@ def predict_weather(input_data, model_path=weather_suitability_model):
     elif not isinstance(input_data, dict):
         return None
 
-    processed_data = input_data.copy()
-    for key, value in processed_data.items():
-        if isinstance(value, list):
-            processed_data[key] = value[0] if value else ""
+    return model.predict_one(normalize_weather_record(input_data))
 
-    input_df = pd.DataFrame([processed_data])
 
+def predict_weather_batch(input_list, model_path=weather_suitability_model):
+    """Predict weather types for many weather dicts in one vectorized call."""
     try:
-        return model.predict(input_df)[0]
-    except Exception:
-        return None
+        model = get_weather_classifier(model_path)
+    except FileNotFoundError:
+        return [None] * len(input_list)
+
+    records = [normalize_weather_record(item) for item in input_list]
+    return model.predict_many(records)
+
 
+def get_weather_model_info():
+    """Version and load time of the weather classifier currently in memory."""
+    return get_registered_model(
+        weather_suitability_model, loader=load_weather_classifier
+    ).info()
+
+
+def get_weather_json(client_ip=None, latitude=None, longitude=None):
+    """
+    Return weather info as a Python dict (never JSON string).
 
-def get_weather_json():
-    """Return weather info as a Python dict (never JSON string)."""
+    Browser coordinates, when given, are snapped to the grid and used directly;
+    otherwise the location is resolved from the client IP.
+    """
 
     result = {
         "location": None,
@@ -133,19 +243,26 @@ def get_weather_json():
         result["error"] = "Weather API key not configured"
         return result
 
-    location = get_location()
-    if not location:
-        result["error"] = "Unable to detect location"
-        return result
-
-    city = location.get("city") or "Delhi"
-
-    weather_data = get_weather(city)
+    cell = snap_to_grid(latitude, longitude) if latitude is not None else None
+    if cell:
+        location = {"city": None, "latitude": cell[0], "longitude": cell[1]}
+        query = f"{cell[0]},{cell[1]}"
+    else:
+        location = get_location(client_ip)
+        if not location:
+            result["error"] = "Unable to detect location"
+            return result
+        query = location.get("city") or "Delhi"
+
+    weather_data = get_weather(query)
     if not weather_data:
         result["location"] = location
         result["error"] = "Failed to fetch weather data"
         return result
 
+    if cell:
+        location["city"] = weather_data["Location"][0].split(",")[0]
+
     prediction = None
     try:
         prediction = predict_weather(weather_data)
@@ -194,62 +311,10 @@ def get_datecity_forecast(city, date, user_id, event=None):
     if isinstance(date, datetime):
         date = date.strftime("%Y-%m-%d")
 
-    # Build the API URL
-    url = f"http://api.weatherapi.com/v1/forecast.json?key={WEATHER_API_KEY}&q={city}&dt={date}"
-
     try:
-        response = requests.get(url)
-        data = response.json()
-        # print("data--------------",data)
-
-        if "error" in data:
-            return {"error": data["error"]["message"]}
-
-        # Forecast values for the day
-        forecast_day = data["forecast"]["forecastday"][0]["day"]
-        avg_temp = forecast_day["avgtemp_c"]
-        humidity = forecast_day["avghumidity"]
-        wind_kph = forecast_day["maxwind_kph"]
-        precip_mm = forecast_day["totalprecip_mm"]
-        condition = forecast_day["condition"]["text"]
-        uv_index = forecast_day["uv"]
-
-        # Convert precipitation mm to rough probability percentage
-        precip_prob = min((precip_mm * 10), 100)
-
-        # Estimate season
-        month = datetime.strptime(date, "%Y-%m-%d").month
-        season_map = {
-            12: "Winter",
-            1: "Winter",
-            2: "Winter",
-            3: "Spring",
-            4: "Spring",
-            5: "Spring",
-            6: "Summer",
-            7: "Summer",
-            8: "Summer",
-            9: "Fall",
-            10: "Fall",
-            11: "Fall",
-        }
-
-        w_data = {
-            "Temperature": avg_temp,
-            "Humidity": humidity,
-            "Wind Speed": wind_kph,
-            "Precipitation (%)": precip_prob,
-            "Cloud Cover": condition,
-            "Atmospheric Pressure": (
-                data["current"]["pressure_mb"] if "current" in data else "N/A"
-            ),
-            "UV Index": uv_index,
-            "Visibility (km)": (
-                data["current"]["vis_km"] if "current" in data else "N/A"
-            ),
-            "Location": [f"{data['location']['name']}, {data['location']['country']}"],
-            "Season": [season_map[month]],
-        }
+        w_data = forecast_weather_cache.get_or_load(
+            (normalize_city(city), date), lambda: fetch_forecast_weather(city, date)
+        )
 
         prediction = predict_weather(w_data)
         top_wear_items = get_next_wardrobe_batch(user_id, prediction, "top")
@@ -272,6 +337,168 @@ def get_datecity_forecast(city, date, user_id, event=None):
         return {"error": str(e)}
 
 
+def forecast_day_features(data, forecastday, date):
+    """Build the classifier input for one entry of a forecast.json response."""
+    # Forecast values for the day
+    forecast_day = forecastday["day"]
+    avg_temp = forecast_day["avgtemp_c"]
+    humidity = forecast_day["avghumidity"]
+    wind_kph = forecast_day["maxwind_kph"]
+    precip_mm = forecast_day["totalprecip_mm"]
+    condition = forecast_day["condition"]["text"]
+    uv_index = forecast_day["uv"]
+
+    # Convert precipitation mm to rough probability percentage
+    precip_prob = min((precip_mm * 10), 100)
+
+    # Estimate season
+    month = datetime.strptime(date, "%Y-%m-%d").month
+    season_map = {
+        12: "Winter",
+        1: "Winter",
+        2: "Winter",
+        3: "Spring",
+        4: "Spring",
+        5: "Spring",
+        6: "Summer",
+        7: "Summer",
+        8: "Summer",
+        9: "Fall",
+        10: "Fall",
+        11: "Fall",
+    }
+
+    w_data = {
+        "Temperature": avg_temp,
+        "Humidity": humidity,
+        "Wind Speed": wind_kph,
+        "Precipitation (%)": precip_prob,
+        "Cloud Cover": condition,
+        "Atmospheric Pressure": (
+            data["current"]["pressure_mb"] if "current" in data else "N/A"
+        ),
+        "UV Index": uv_index,
+        "Visibility (km)": (
+            data["current"]["vis_km"] if "current" in data else "N/A"
+        ),
+        "Location": [f"{data['location']['name']}, {data['location']['country']}"],
+        "Season": [season_map[month]],
+    }
+
+    return w_data
+
+
+def fetch_forecast_weather(city, date):
+    """Fetch the weather features for one city and date ('YYYY-MM-DD')."""
+    # Build the API URL
+    url = f"{WEATHER_API_BASE_URL}/forecast.json?key={WEATHER_API_KEY}&q={city}&dt={date}"
+
+    response = http_client.get("weather_forecast", url)
+    data = response.json()
+    # print("data--------------",data)
+
+    if "error" in data:
+        raise ValueError(data["error"]["message"])
+
+    return forecast_day_features(data, data["forecast"]["forecastday"][0], date)
+
 
+def fetch_forecast_range_weather(city, days):
+    """
+    Fetch `days` days of forecast (starting today) for a city in one request.
+
+    Returns:
+        dict: {'YYYY-MM-DD': weather features} for every day in the response
+    """
+    url = f"{WEATHER_API_BASE_URL}/forecast.json?key={WEATHER_API_KEY}&q={city}&days={days}"
+
+    response = http_client.get("weather_forecast", url)
+    data = response.json()
+
+    if "error" in data:
+        raise ValueError(data["error"]["message"])
+
+    return {
+        forecastday["date"]: forecast_day_features(data, forecastday, forecastday["date"])
+        for forecastday in data["forecast"]["forecastday"]
+    }
+
+
+def get_trip_forecast(city, dates, user_id, max_forecast_days=14):
+    """
+    Weather prediction and wardrobe items for every date of a trip.
+
+    All uncached dates inside the forecast window are fetched with a single
+    days=N request and classified in one batch call. Dates outside the window
+    fall back to the per-date endpoint.
 
+    Args:
+        city (str): City name (e.g., 'Baltimore')
+        dates (list): Dates in 'YYYY-MM-DD' format
+
+    Returns:
+        dict: {date: result} with the same result shape as get_datecity_forecast
+    """
+    city_key = normalize_city(city)
+    weather_by_date = {}
+    errors = {}
+
+    missing = []
+    for date in dates:
+        cached = forecast_weather_cache.get((city_key, date))
+        if cached is not None:
+            weather_by_date[date] = cached
+        else:
+            missing.append(date)
+
+    today = datetime.now().date()
+    in_window = [
+        d
+        for d in missing
+        if 0 <= (datetime.strptime(d, "%Y-%m-%d").date() - today).days < max_forecast_days
+    ]
+    if in_window:
+        days = max(
+            (datetime.strptime(d, "%Y-%m-%d").date() - today).days for d in in_window
+        ) + 1
+        try:
+            fetched = fetch_forecast_range_weather(city, days)
+            for date, w_data in fetched.items():
+                forecast_weather_cache.set((city_key, date), w_data)
+            for date in in_window:
+                if date in fetched:
+                    weather_by_date[date] = fetched[date]
+        except Exception as e:
+            print(f"Warning: Multi-day forecast failed for {city} - {e}")
+
+    # Anything the range request did not cover goes through the per-date path
+    for date in missing:
+        if date in weather_by_date:
+            continue
+        try:
+            weather_by_date[date] = forecast_weather_cache.get_or_load(
+                (city_key, date), lambda date=date: fetch_forecast_weather(city, date)
+            )
+        except Exception as e:
+            errors[date] = str(e)
+
+    ok_dates = [d for d in dates if d in weather_by_date]
+    predictions = predict_weather_batch([weather_by_date[d] for d in ok_dates])
+
+    results = {date: {"error": message} for date, message in errors.items()}
+    for date, prediction in zip(ok_dates, predictions):
+        try:
+            top_wear_items = get_next_wardrobe_batch(user_id, prediction, "top")
+            bottom_wear_items = get_next_wardrobe_batch(user_id, prediction, "bottom")
+        except Exception as e:
+            results[date] = {"error": str(e)}
+            continue
+        results[date] = {
+            "city": city,
+            "date": date,
+            "prediction": prediction,
+            "top_wear_items": top_wear_items,
+            "bottom_wear_items": bottom_wear_items,
+        }
 
+    return results
@@ -0,0 +1,226 @@
+import math
+import pickle
+import numpy as np
+import pandas as pd
+from sklearn.compose import ColumnTransformer
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.impute import KNNImputer, SimpleImputer
+from sklearn.preprocessing import OneHotEncoder, RobustScaler
+
+
+class CompiledWeatherForest:
+    """
+    Array-only version of the weather classification pipeline trained in
+    models_factory/weather_classification_model.py.
+
+    Preprocessing is reduced to RobustScaler constants and a one-hot lookup
+    dict, and every tree of the RandomForest is flattened into shared node
+    arrays that are walked for all trees and rows at once with NumPy.
+
+    Rows the fast path cannot reproduce exactly (missing or non-numeric
+    numerical values, missing or non-string categories) are reported as unsupported so
+    the caller can fall back to the sklearn pipeline.
+    """
+
+    def __init__(self, pipeline):
+        preprocessor = pipeline.named_steps["preprocessor"]
+        forest = pipeline.named_steps["classifier"]
+        if not isinstance(preprocessor, ColumnTransformer) or not isinstance(
+            forest, RandomForestClassifier
+        ):
+            raise ValueError("Unsupported pipeline layout")
+        if forest.n_outputs_ != 1:
+            raise ValueError("Multi-output forests are not supported")
+
+        self.numerical_cols = []
+        self.categorical_cols = []
+        self.num_offset = 0
+        self.center = None
+        self.scale = None
+        self.onehot_index = {}
+        n_features = 0
+
+        for name, transformer, columns in preprocessor.transformers_:
+            if transformer == "drop" or len(columns) == 0:
+                continue
+            if name == "num":
+                self.num_offset = n_features
+                self._compile_numerical(transformer, columns)
+                n_features += len(columns)
+            elif name == "cat":
+                n_features += self._compile_categorical(transformer, columns, n_features)
+            else:
+                raise ValueError(f"Unsupported transformer: {name}")
+
+        self.n_features = n_features
+        self.classes = forest.classes_
+        self._compile_trees(forest.estimators_)
+
+    def _compile_numerical(self, transformer, columns):
+        steps = dict(transformer.steps)
+        imputer, scaler = steps.get("imputer"), steps.get("scaler")
+        if not isinstance(imputer, KNNImputer) or not isinstance(scaler, RobustScaler):
+            raise ValueError("Unsupported numerical transformer")
+        if hasattr(imputer, "_valid_mask") and not np.all(imputer._valid_mask):
+            raise ValueError("Imputer drops columns")
+
+        n = len(columns)
+        self.numerical_cols = list(columns)
+        self.center = (
+            scaler.center_ if scaler.center_ is not None else np.zeros(n)
+        ).astype(np.float64)
+        self.scale = (
+            scaler.scale_ if scaler.scale_ is not None else np.ones(n)
+        ).astype(np.float64)
+
+    def _compile_categorical(self, transformer, columns, offset):
+        steps = dict(transformer.steps)
+        imputer, encoder = steps.get("imputer"), steps.get("onehot")
+        if not isinstance(imputer, SimpleImputer) or not isinstance(encoder, OneHotEncoder):
+            raise ValueError("Unsupported categorical transformer")
+        if encoder.drop is not None or getattr(encoder, "infrequent_categories_", None):
+            raise ValueError("Unsupported one-hot options")
+
+        self.categorical_cols = list(columns)
+        # (column position, category) -> output feature index
+        for col_idx, categories in enumerate(encoder.categories_):
+            for category in categories:
+                self.onehot_index[(col_idx, category)] = offset
+                offset += 1
+        return sum(len(c) for c in encoder.categories_)
+
+    def _compile_trees(self, estimators):
+        left, right, feature, threshold, values, roots = [], [], [], [], [], []
+        offset = 0
+        max_depth = 0
+        for estimator in estimators:
+            tree = estimator.tree_
+            n_nodes = tree.node_count
+            node_ids = np.arange(n_nodes) + offset
+            is_leaf = tree.children_left == -1
+
+            # Leaves point to themselves so every walk can run for max_depth steps
+            left.append(np.where(is_leaf, node_ids, tree.children_left + offset))
+            right.append(np.where(is_leaf, node_ids, tree.children_right + offset))
+            feature.append(np.where(is_leaf, 0, tree.feature))
+            threshold.append(np.where(is_leaf, np.inf, tree.threshold))
+
+            # Same per-tree normalisation as DecisionTreeClassifier.predict_proba
+            proba = tree.value[:, 0, :].astype(np.float64)
+            normalizer = proba.sum(axis=1, keepdims=True)
+            normalizer[normalizer == 0.0] = 1.0
+            values.append(proba / normalizer)
+
+            roots.append(offset)
+            offset += n_nodes
+            max_depth = max(max_depth, tree.max_depth)
+
+        self.left = np.concatenate(left).astype(np.intp)
+        self.right = np.concatenate(right).astype(np.intp)
+        self.feature = np.concatenate(feature).astype(np.intp)
+        self.threshold = np.concatenate(threshold).astype(np.float64)
+        self.values = np.concatenate(values)
+        self.roots = np.array(roots, dtype=np.intp)
+        self.max_depth = max_depth
+
+    def encode(self, record):
+        """Return the feature vector for one record, or None if unsupported."""
+        x = np.zeros(self.n_features, dtype=np.float64)
+
+        for i, col in enumerate(self.numerical_cols):
+            value = record.get(col)
+            if isinstance(value, bool) or not isinstance(value, (int, float, np.number)):
+                return None
+            if not math.isfinite(value):
+                return None
+            x[self.num_offset + i] = value
+        num_slice = slice(self.num_offset, self.num_offset + len(self.numerical_cols))
+        x[num_slice] = (x[num_slice] - self.center) / self.scale
+
+        for i, col in enumerate(self.categorical_cols):
+            value = record.get(col)
+            if not isinstance(value, str):
+                return None
+            index = self.onehot_index.get((i, value))
+            if index is not None:  # handle_unknown="ignore" -> all zeros
+                x[index] = 1.0
+        return x
+
+    def predict_proba_encoded(self, X):
+        """Class probabilities for an already encoded (n_samples, n_features) matrix."""
+        # Trees compare float32 features against float64 thresholds
+        X = X.astype(np.float32).astype(np.float64)
+        n_samples = X.shape[0]
+        rows = np.arange(n_samples)
+
+        nodes = np.repeat(self.roots[:, None], n_samples, axis=1)
+        for _ in range(self.max_depth):
+            go_left = X[rows, self.feature[nodes]] <= self.threshold[nodes]
+            nodes = np.where(go_left, self.left[nodes], self.right[nodes])
+
+        # Accumulate in tree order to match RandomForestClassifier exactly
+        leaf_values = self.values[nodes]
+        proba = np.zeros((n_samples, len(self.classes)), dtype=np.float64)
+        for tree_values in leaf_values:
+            proba += tree_values
+        proba /= len(self.roots)
+        return proba
+
+    def predict_encoded(self, X):
+        return self.classes.take(np.argmax(self.predict_proba_encoded(X), axis=1))
+
+
+def normalize_weather_record(input_data):
+    """Flatten single-element lists the way the API payloads arrive."""
+    processed_data = input_data.copy()
+    for key, value in processed_data.items():
+        if isinstance(value, list):
+            processed_data[key] = value[0] if value else ""
+    return processed_data
+
+
+class WeatherClassifier:
+    """The sklearn pipeline plus its compiled fast path, when one can be built."""
+
+    def __init__(self, pipeline):
+        self.pipeline = pipeline
+        try:
+            self.compiled = CompiledWeatherForest(pipeline)
+        except Exception as e:
+            print(f"Warning: Weather fast path unavailable - {e}")
+            self.compiled = None
+
+    def predict_many(self, records):
+        """Predict a list of already normalized records in one call."""
+        if not records:
+            return []
+        predictions = [None] * len(records)
+        fast_rows, fast_positions, slow_positions = [], [], []
+
+        for pos, record in enumerate(records):
+            x = self.compiled.encode(record) if self.compiled is not None else None
+            if x is None:
+                slow_positions.append(pos)
+            else:
+                fast_rows.append(x)
+                fast_positions.append(pos)
+
+        if fast_rows:
+            labels = self.compiled.predict_encoded(np.vstack(fast_rows))
+            for pos, label in zip(fast_positions, labels):
+                predictions[pos] = label
+
+        for pos in slow_positions:
+            try:
+                predictions[pos] = self.pipeline.predict(pd.DataFrame([records[pos]]))[0]
+            except Exception:
+                predictions[pos] = None
+        return predictions
+
+    def predict_one(self, record):
+        return self.predict_many([record])[0]
+
+
+def load_weather_classifier(data):
+    """Loader for the model registry: unpickle the pipeline and compile it."""
+    return WeatherClassifier(pickle.loads(data))
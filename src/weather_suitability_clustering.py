@@ -2,8 +2,11 @@
 import pandas as pd
 import numpy as np
 from kmodes.kprototypes import KPrototypes
+import joblib
 import os
 import toml
+from datetime import datetime
+from src.soft_labels import compute_soft_labels
 
 # Find base directory (WearPerfect folder)
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -13,6 +16,20 @@ CONFIG_PATH = os.path.join(BASE_DIR, "config", "config.toml")
 # Load config
 config = toml.load(CONFIG_PATH)
 clustering_weather_data_topwear = config["paths"]["clustering_weather_data_topwear"]
+topwear_cluster_model = config["paths"].get(
+    "topwear_cluster_model", "Models/seasonality_clustering/kproto_topwear_model.pkl"
+)
+
+TOPWEAR_CATEGORICAL_COLS = [
+    "sleeve_length",
+    "neckline",
+    "outer_clothing_cardigan",
+    "upper_clothing_covering_navel",
+    "Fabric_Type",
+    "Pattern_Type",
+]
+TOPWEAR_NUMERICAL_COLS = ["warmth_score", "breathability_score"]
+CLUSTER_TO_WEATHER = {0: "sunny", 1: "cloudy", 2: "snowy", 3: "rainy"}
 
 
 def preprocess_topwear_data(
@@ -21,15 +38,8 @@ def preprocess_topwear_data(
     normalize_scores=True,
 ):
 
-    categorical_cols = [
-        "sleeve_length",
-        "neckline",
-        "outer_clothing_cardigan",
-        "upper_clothing_covering_navel",
-        "Fabric_Type",
-        "Pattern_Type",
-    ]
-    numerical_cols = ["warmth_score", "breathability_score"]
+    categorical_cols = TOPWEAR_CATEGORICAL_COLS
+    numerical_cols = TOPWEAR_NUMERICAL_COLS
     new_record_df = pd.DataFrame([new_record_dict])
     # Append new record to original dataframe for clustering
     df = pd.concat([df, new_record_df], ignore_index=True)  # Combine dataframes
@@ -53,37 +63,86 @@ def fit_kprototypes(X_np, cat_cols, n_clusters=4, random_state=42):
     return kproto, clusters, centroids
 
 
-# Function to compute soft (fuzzy) labels
-def compute_soft_labels(X_np, centroids, categorical_cols):
-    soft_labels = []
-    for row in X_np:
-        distances = []
-        for center in centroids:
-            d = 0
-            for i in range(len(row)):
-                if i in categorical_cols:
-                    d += int(str(row[i]) != str(center[i]))
-                else:
-                    d += (float(row[i]) - float(center[i])) ** 2
-            distances.append(np.sqrt(d))
-        distances = np.array(distances)
-        proximity = 1 / (distances + 1e-6)
-        proximity /= proximity.sum()
-        soft_labels.append(proximity)
-    return np.array(soft_labels)
-
-
 # Function to map clusters to weather tags
-def assign_weather_labels(soft_scores, threshold=0.25):
-    cluster_to_weather = {0: "sunny", 1: "cloudy", 2: "snowy", 3: "rainy"}
+def assign_weather_labels(soft_scores, threshold=0.25, cluster_to_weather=None):
+    cluster_to_weather = cluster_to_weather or CLUSTER_TO_WEATHER
     multi_labels = []
     for row in soft_scores:
         tags = [cluster_to_weather[i] for i, p in enumerate(row) if p >= threshold]
         multi_labels.append(tags if tags else ["sunny"])
     return multi_labels
 
+def build_topwear_cluster_model(df, n_clusters=4, random_state=42):
+    """
+    Fit K-Prototypes once on the reference top-wear dataset and return the
+    artifact needed to tag new items without refitting.
+    """
+    cat_data = df[TOPWEAR_CATEGORICAL_COLS].astype(str).to_numpy()
+    num_data = df[TOPWEAR_NUMERICAL_COLS].astype(float).to_numpy()
+    X_np = np.concatenate([num_data, cat_data], axis=1)
+    cat_cols = list(range(num_data.shape[1], X_np.shape[1]))
+
+    kproto, _, centroids = fit_kprototypes(
+        X_np, cat_cols, n_clusters=n_clusters, random_state=random_state
+    )
+    return {
+        "kproto": kproto,
+        "centroids": centroids,
+        "cat_indices": cat_cols,
+        "numerical_cols": list(TOPWEAR_NUMERICAL_COLS),
+        "categorical_cols": list(TOPWEAR_CATEGORICAL_COLS),
+        "cluster_to_weather": dict(CLUSTER_TO_WEATHER),
+        "n_samples": len(df),
+        "trained_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+    }
+
+
+def save_topwear_cluster_model(artifact, model_path=topwear_cluster_model):
+    os.makedirs(os.path.dirname(model_path) or ".", exist_ok=True)
+    # Write to a temp file first so running workers never see a partial artifact
+    tmp_path = model_path + ".tmp"
+    joblib.dump(artifact, tmp_path)
+    os.replace(tmp_path, model_path)
+
+
+def load_topwear_cluster_model(model_path=topwear_cluster_model):
+    """Load the fitted clustering artifact, or return None if it has not been built."""
+    try:
+        artifact = joblib.load(model_path)
+    except FileNotFoundError:
+        print(f"Warning: Top wear cluster model not found at {model_path}")
+        return None
+    print(f"Loaded top wear cluster model from {model_path}")
+    return artifact
+
+
+def assign_topwear_cluster(new_record_dict, artifact, threshold=0.25):
+    """
+    Tag a single top-wear record using the pre-fitted centroids.
+    Only the distances to the stored centroids are computed, no refitting.
+    """
+    num_data = [float(new_record_dict[col]) for col in artifact["numerical_cols"]]
+    cat_data = [str(new_record_dict[col]) for col in artifact["categorical_cols"]]
+    row_np = np.array([num_data + cat_data], dtype=object)
+
+    soft_scores = compute_soft_labels(
+        row_np, artifact["centroids"], artifact["cat_indices"]
+    )
+    return assign_weather_labels(
+        soft_scores, threshold, artifact["cluster_to_weather"]
+    )[0]
+
+
+# Loaded once at startup, rebuild with models_factory/topwear_weather_clustering_model.py
+topwear_cluster_artifact = load_topwear_cluster_model()
+
+
 # Master function to run the entire clustering flow
 def run_topwear_clustering(new_record_dict):
+    if topwear_cluster_artifact is not None:
+        return assign_topwear_cluster(new_record_dict, topwear_cluster_artifact)
+
+    # Fallback: no fitted artifact available, refit on the reference data
     df = pd.read_csv(clustering_weather_data_topwear)
     # Preprocessing
     df, X_np, cat_cols, categorical_cols, numerical_cols = preprocess_topwear_data(